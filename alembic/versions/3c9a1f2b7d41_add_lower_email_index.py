@@ -0,0 +1,43 @@
+"""add lower(email) unique index
+
+Revision ID: 3c9a1f2b7d41
+Revises: d6cbbdb3d57a
+Create Date: 2026-10-18 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f2b7d41'
+down_revision: Union[str, None] = 'd6cbbdb3d57a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Accounts whose emails differ only by case cannot be lowercased or
+    # indexed without violating uniqueness. Merging them would mean picking
+    # an owner for their reports and listings, so leave that to an operator.
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) AS email, array_agg(id ORDER BY id) AS ids "
+        "FROM users GROUP BY lower(email) HAVING count(*) > 1 ORDER BY lower(email)"
+    )).all()
+    if duplicates:
+        listed = "; ".join(f"{row.email} (user ids {', '.join(map(str, row.ids))})" for row in duplicates)
+        raise RuntimeError(
+            f"Cannot add the unique lower(email) index: {len(duplicates)} emails are used by several "
+            f"accounts differing only by case: {listed}. Merge or rename these accounts and re-run the migration."
+        )
+
+    # Emails are stored lowercased by the auth routes, but older rows may not be.
+    # Normalize them first so the unique index can be built.
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
@@ -0,0 +1,26 @@
+"""add collector_profiles updated_at
+
+Revision ID: 6f1c3a8e2b57
+Revises: 9d4f2a6b8e13
+Create Date: 2026-10-18 14:21:06.538114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1c3a8e2b57'
+down_revision: Union[str, None] = '9d4f2a6b8e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('collector_profiles', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('collector_profiles', 'updated_at')
@@ -0,0 +1,25 @@
+"""add listing keyset pagination index
+
+Revision ID: 7b52e0c9a6f3
+Revises: 3c9a1f2b7d41
+Create Date: 2026-10-18 10:03:17.402911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b52e0c9a6f3'
+down_revision: Union[str, None] = '3c9a1f2b7d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_marketplace_listings_created_at_id', 'marketplace_listings', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_marketplace_listings_created_at_id', table_name='marketplace_listings')
@@ -0,0 +1,35 @@
+"""add trigram indexes on location
+
+Revision ID: a41d8e6f2c95
+Revises: 7b52e0c9a6f3
+Create Date: 2026-10-18 10:41:52.730164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d8e6f2c95'
+down_revision: Union[str, None] = '7b52e0c9a6f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GIN trigram indexes serve both ILIKE '%...%' and the fuzzy (<%) search
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_collector_profiles_location_trgm', 'collector_profiles', ['location'],
+        unique=False, postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_marketplace_listings_location_trgm', 'marketplace_listings', ['location'],
+        unique=False, postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_marketplace_listings_location_trgm', table_name='marketplace_listings')
+    op.drop_index('ix_collector_profiles_location_trgm', table_name='collector_profiles')
@@ -0,0 +1,26 @@
+"""add collector_profiles last_seen_at
+
+Revision ID: b8e2d5f1a934
+Revises: 6f1c3a8e2b57
+Create Date: 2026-10-18 16:02:47.219830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2d5f1a934'
+down_revision: Union[str, None] = '6f1c3a8e2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('collector_profiles', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('collector_profiles', 'last_seen_at')
@@ -0,0 +1,37 @@
+"""add coordinates and geohash
+
+Revision ID: c5e27b9d0a18
+Revises: a41d8e6f2c95
+Create Date: 2026-10-18 11:20:05.551873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e27b9d0a18'
+down_revision: Union[str, None] = 'a41d8e6f2c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['collector_profiles', 'marketplace_listings', 'illegal_dump_reports']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('latitude', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('longitude', sa.Float(), nullable=True))
+        # "C" collation keeps prefix range scans on the btree index byte-ordered
+        op.add_column(table, sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True))
+        op.create_index(op.f(f'ix_{table}_geohash'), table, ['geohash'], unique=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(op.f(f'ix_{table}_geohash'), table_name=table)
+        op.drop_column(table, 'geohash')
+        op.drop_column(table, 'longitude')
+        op.drop_column(table, 'latitude')
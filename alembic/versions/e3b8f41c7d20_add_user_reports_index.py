@@ -0,0 +1,33 @@
+"""add user reports composite indexes
+
+Revision ID: e3b8f41c7d20
+Revises: c5e27b9d0a18
+Create Date: 2026-10-18 12:02:44.918305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f41c7d20'
+down_revision: Union[str, None] = 'c5e27b9d0a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_illegal_dump_reports_user_status_created', 'illegal_dump_reports',
+        ['user_id', 'status', 'created_at'], unique=False
+    )
+    op.create_index(
+        'ix_illegal_dump_reports_user_created_id', 'illegal_dump_reports',
+        ['user_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_illegal_dump_reports_user_created_id', table_name='illegal_dump_reports')
+    op.drop_index('ix_illegal_dump_reports_user_status_created', table_name='illegal_dump_reports')
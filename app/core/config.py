@@ -6,6 +6,59 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Database engine and connection pool
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
+    # Password hashing (bcrypt runs in a dedicated thread pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
+
+    # Authenticated-user cache used by get_current_user
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Request body limits, enforced before the body is parsed
+    MAX_REQUEST_BODY_BYTES: int = 1024 * 1024
+    MAX_UPLOAD_BODY_BYTES: int = 5 * 1024 * 1024 + 64 * 1024  # one 5MB image plus form fields
+
+    # Resumable uploads; keep the directory outside the public uploads/ mount
+    UPLOAD_SESSION_DIR: str = "upload_sessions"
+    UPLOAD_SESSION_TTL_SECONDS: float = 24 * 60 * 60
+    UPLOAD_SESSION_CLEANUP_INTERVAL_SECONDS: float = 15 * 60
+
+    # Background jobs (app.core.jobs)
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    JOB_LOCK_TIMEOUT_SECONDS: float = 300.0
+    JOB_RETENTION_SECONDS: float = 7 * 24 * 3600.0  # DONE/FAILED jobs are deleted after this
+    JOB_PURGE_INTERVAL_SECONDS: float = 3600.0
+
+    # Collector match index (app.core.matching); full rebuild interval
+    MATCH_INDEX_REFRESH_SECONDS: float = 300.0
+
+    # Collector status heartbeats, buffered in memory (app.core.heartbeats)
+    HEARTBEAT_FLUSH_INTERVAL_SECONDS: float = 5.0
+    HEARTBEAT_TIMEOUT_SECONDS: float = 90.0
+
+    # Listing event stream (app.core.events); events buffered per client
+    SSE_CLIENT_BUFFER_SIZE: int = 100
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    # Streams end after about this long and EventSource reconnects with Last-Event-ID
+    SSE_MAX_STREAM_SECONDS: float = 300.0
+
+    # Image variant generation (Pillow runs in a process pool)
+    IMAGE_VARIANT_WORKERS: int = 2
+
     class Config:
         env_file = ".env"
 
@@ -1,5 +1,11 @@
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
 # Replace psycopg2 with asyncpg in the connection string
@@ -8,9 +14,60 @@ SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL.replace(
     "postgresql+asyncpg://"
 )
 
+class PoolStats:
+    """Connection checkout counters collected by InstrumentedQueuePool"""
+
+    def __init__(self):
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def snapshot(self, pool) -> dict:
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+pool_stats = PoolStats()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait for a connection"""
+
+    def connect(self):
+        pool_stats.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_stats.waiting -= 1
+            pool_stats.checkouts += 1
+            pool_stats.total_wait += elapsed
+            pool_stats.max_wait = max(pool_stats.max_wait, elapsed)
+
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    echo=True  # Set to False in production
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -21,14 +78,91 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
-async def get_async_db():
-    async with AsyncSessionLocal() as db:
-        yield db
+class ConnectionHoldStats:
+    """How long each route keeps a pooled connection checked out"""
+
+    def __init__(self):
+        self._routes: dict = {}
+
+    def record(self, route: str, seconds: float):
+        stats = self._routes.setdefault(route, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+
+    def snapshot(self) -> list:
+        return sorted(
+            (
+                {
+                    "route": route,
+                    "count": stats["count"],
+                    "avg_hold_ms": round(stats["total"] / stats["count"] * 1000, 2),
+                    "max_hold_ms": round(stats["max"] * 1000, 2),
+                    "total_hold_ms": round(stats["total"] * 1000, 2),
+                }
+                for route, stats in self._routes.items()
+            ),
+            key=lambda item: item["total_hold_ms"],
+            reverse=True
+        )
 
-# Sync dependency (for existing auth)
-async def get_db():
-    async with AsyncSessionLocal() as db:
+connection_hold_stats = ConnectionHoldStats()
+
+# A session holds its connection from the start of a transaction until that
+# transaction ends (commit, rollback or close); time that span per route.
+@event.listens_for(Session, "after_begin")
+def _connection_acquired(session, transaction, connection):
+    if "route" in session.info:
+        session.info.setdefault("connection_acquired_at", time.perf_counter())
+
+@event.listens_for(Session, "after_transaction_end")
+def _connection_released(session, transaction):
+    if transaction.parent is not None:
+        return
+    acquired_at = session.info.pop("connection_acquired_at", None)
+    if acquired_at is not None:
+        connection_hold_stats.record(session.info["route"], time.perf_counter() - acquired_at)
+
+class LazySession:
+    """Stands in for an AsyncSession and only opens one when it is first used.
+
+    Requests that end early (auth failure, validation error, cache hit) never
+    touch the pool. ``release()`` closes the session mid-request so the
+    connection goes back to the pool before slow work; any later use
+    transparently opens a new session.
+    """
+
+    def __init__(self, route: str):
+        self._route = route
+        self._session: Optional[AsyncSession] = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = AsyncSessionLocal(info={"route": self._route})
+        return getattr(self._session, name)
+
+    async def release(self):
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+def get_pool_stats() -> dict:
+    return pool_stats.snapshot(engine.pool)
+
+def get_connection_hold_stats() -> list:
+    return connection_hold_stats.snapshot()
+
+async def get_async_db(request: Request):
+    route = request.scope.get("route")
+    db = LazySession(f"{request.method} {getattr(route, 'path', request.url.path)}")
+    try:
         yield db
+    finally:
+        await db.release()
+
+# Same callable as get_async_db so FastAPI shares one session per request
+# between auth dependencies and the handler.
+get_db = get_async_db
 
 # Keep your existing sync engine for migrations if needed
 from sqlalchemy import create_engine
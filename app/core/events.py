@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+
+from app.core.config import settings
+
+class _Event:
+    __slots__ = ("seq", "encoded", "waste_type", "location")
+
+    def __init__(self, event_id: str, seq: int, event_type: str, data: str, waste_type: str, location: str):
+        self.seq = seq
+        # Encoded once and shared by every subscriber
+        self.encoded = f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n".encode()
+        self.waste_type = waste_type
+        self.location = location.lower()
+
+class Subscription:
+    def __init__(self, waste_type: Optional[str], location: Optional[str], buffer_size: int):
+        self.waste_type = waste_type
+        self.location = location.lower() if location else None
+        self.queue: "asyncio.Queue[Optional[_Event]]" = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def wants(self, event: _Event) -> bool:
+        return self.location is None or self.location in event.location
+
+class ListingEventBroker:
+    """In-process fan-out of listing events to server-sent event streams.
+
+    Subscribers are bucketed by waste type, so publishing only visits the
+    ones that can match. Each subscriber has a bounded queue; a client that
+    falls ``buffer_size`` events behind is disconnected with a ``reset``
+    event instead of growing memory, and should reload the listings. A
+    short history lets reconnecting clients resume from Last-Event-ID.
+    Only events published by this worker process are seen. Event ids are
+    ``<epoch>-<seq>`` with a random per-process epoch, so an id issued by
+    another worker or before a restart is recognised and not replayed
+    against this process's sequence.
+
+    Each stream ends by itself after about ``max_stream_seconds`` (with
+    jitter, so clients do not reconnect in lockstep). uvicorn waits for
+    open connections before running shutdown hooks, so this, not
+    ``close``, is what keeps long-lived streams from holding up a
+    restart indefinitely.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int,
+        keepalive_seconds: float,
+        max_stream_seconds: float,
+        history_size: int = 256
+    ):
+        self.buffer_size = buffer_size
+        self.keepalive_seconds = keepalive_seconds
+        self.max_stream_seconds = max_stream_seconds
+        self._by_waste_type: Dict[Optional[str], Set[Subscription]] = {}
+        self._history: Deque[_Event] = deque(maxlen=history_size)
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seqs = itertools.count(1)
+        self._closed = False
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped_clients = 0
+
+    def publish(self, event_type: str, data: str, waste_type, location: str) -> None:
+        """Queue ``data`` (already JSON) for every matching subscriber; never blocks"""
+        waste_type = str(getattr(waste_type, "value", waste_type))
+        seq = next(self._seqs)
+        event = _Event(f"{self.epoch}-{seq}", seq, event_type, data, waste_type, location or "")
+        self._history.append(event)
+        self.published += 1
+        for key in (waste_type, None):
+            for subscription in self._by_waste_type.get(key, ()):
+                self._offer(subscription, event)
+
+    def _offer(self, subscription: Subscription, event: _Event) -> None:
+        if subscription.overflowed or not subscription.wants(event):
+            return
+        try:
+            subscription.queue.put_nowait(event)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            subscription.overflowed = True
+            self.dropped_clients += 1
+
+    def _subscribe(self, waste_type: Optional[str], location: Optional[str]) -> Subscription:
+        subscription = Subscription(waste_type, location, self.buffer_size)
+        self._by_waste_type.setdefault(waste_type, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        bucket = self._by_waste_type.get(subscription.waste_type)
+        if bucket is not None:
+            bucket.discard(subscription)
+            if not bucket:
+                del self._by_waste_type[subscription.waste_type]
+
+    def _resume_after(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number to replay after, if ``last_event_id`` came from this process"""
+        epoch, _, seq = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    async def stream(
+        self,
+        waste_type: Optional[str] = None,
+        location: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """SSE body for one client; unsubscribes when the client goes away"""
+        waste_type = str(getattr(waste_type, "value", waste_type)) if waste_type else None
+        # Subscribing and replaying without an await in between means no
+        # event can be published after one and before the other
+        subscription = self._subscribe(waste_type, location)
+        resume_after = self._resume_after(last_event_id)
+        if resume_after is not None:
+            for event in list(self._history):
+                if event.seq > resume_after and waste_type in (None, event.waste_type):
+                    self._offer(subscription, event)
+        # Highest sequence sent; anything at or below it is a duplicate
+        sent = resume_after or 0
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield b"retry: 3000\n\n"
+            deadline = time.monotonic() + self.max_stream_seconds * random.uniform(0.9, 1.1)
+            while not self._closed:
+                if subscription.overflowed and subscription.queue.empty():
+                    yield b"event: reset\ndata: {}\n\n"
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # EventSource reconnects after the retry delay and resumes from Last-Event-ID
+                    return
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=min(self.keepalive_seconds, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line; keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                if event.seq <= sent:
+                    continue
+                sent = event.seq
+                yield event.encoded
+        finally:
+            self._unsubscribe(subscription)
+
+    def close(self) -> None:
+        """End every open stream, e.g. from a shutdown hook that runs while some are open"""
+        self._closed = True
+        for bucket in self._by_waste_type.values():
+            for subscription in bucket:
+                try:
+                    subscription.queue.put_nowait(None)
+                except asyncio.QueueFull:
+                    # Woken by its backlog; the loop then sees the broker is closed
+                    pass
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(bucket) for bucket in self._by_waste_type.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_clients": self.dropped_clients,
+        }
+
+listing_events = ListingEventBroker(
+    settings.SSE_CLIENT_BUFFER_SIZE, settings.SSE_KEEPALIVE_SECONDS, settings.SSE_MAX_STREAM_SECONDS
+)
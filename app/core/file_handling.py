@@ -1,39 +1,135 @@
+import hashlib
 import os
-from fastapi import UploadFile, HTTPException
-from datetime import datetime
+import uuid
+from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
 from typing import Tuple
 
-UPLOAD_DIR = "uploads/dump_reports"
-ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png"]
+# Content-addressed store: uploads/blobs/ab/cd/<sha256>.<ext>
+BLOB_DIR = "uploads/blobs"
+# Uploads in progress. Inside uploads/ so os.replace into BLOB_DIR stays a
+# rename even when uploads/ is its own volume; UploadStaticFiles refuses to
+# serve dot-directories, so partial files are never reachable by URL
+BLOB_TMP_DIR = "uploads/.tmp"
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png"}
+ALLOWED_IMAGE_TYPES = list(IMAGE_EXTENSIONS)
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes held in memory per upload at any time
 
-def save_uploaded_file(file: UploadFile) -> Tuple[str, str]:
-    # Create upload directory if it doesn't exist
-    Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
-    
-    # Validate file type
+def validate_image_type(file: UploadFile) -> None:
     if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(
-            status_code=400,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
         )
-    
-    # Validate file size
-    if file.size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Max size: {MAX_FILE_SIZE//(1024*1024)}MB"
+
+async def stream_upload_to_disk(file: UploadFile, file_path: str, max_size: int = MAX_FILE_SIZE) -> Tuple[int, str]:
+    """Copy an upload to ``file_path`` chunk by chunk.
+
+    Returns the byte count and the SHA-256 hex digest of the content,
+    computed while copying. Disk writes run in the threadpool so the event
+    loop is never blocked. The client-supplied size is not trusted: bytes
+    are counted as they are copied and the upload is aborted with 413 as
+    soon as ``max_size`` is crossed. The data goes to a ``.part`` file that
+    is only renamed into place once complete, and is removed if anything
+    fails.
+    """
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    partial_path = f"{file_path}.part"
+    size = 0
+    digest = hashlib.sha256()
+    buffer = await run_in_threadpool(open, partial_path, "wb")
+    try:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File too large. Max size: {max_size//(1024*1024)}MB"
+                    )
+                await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        finally:
+            await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, partial_path, file_path)
+    except BaseException:
+        await run_in_threadpool(_remove_if_exists, partial_path)
+        raise
+    return size, digest.hexdigest()
+
+def _write_chunk(buffer, digest, chunk: bytes) -> None:
+    # hashlib releases the GIL on large buffers, so hash alongside the write
+    digest.update(chunk)
+    buffer.write(chunk)
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def blob_path(digest: str, extension: str) -> str:
+    """Path of a blob relative to BLOB_DIR, sharded on the first two bytes of the hash"""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+def blob_url(digest: str, extension: str) -> str:
+    return f"/{BLOB_DIR}/{blob_path(digest, extension)}"
+
+def _place_blob(temp_path: str, final_path: str) -> None:
+    if os.path.exists(final_path):
+        # Same bytes already stored
+        os.remove(temp_path)
+        return
+    Path(final_path).parent.mkdir(parents=True, exist_ok=True)
+    # Atomic, so a blob is never visible half-written; a concurrent upload
+    # of the same bytes just replaces an identical file
+    os.replace(temp_path, final_path)
+
+async def save_image_blob(file: UploadFile, max_size: int = MAX_FILE_SIZE) -> Tuple[str, str]:
+    """Store an uploaded image in the content-addressed blob store.
+
+    Returns the content hash and the public URL. Identical images are
+    stored once, and the name never depends on the client filename or on
+    upload time.
+    """
+    validate_image_type(file)
+    extension = IMAGE_EXTENSIONS[file.content_type]
+
+    temp_path = os.path.join(BLOB_TMP_DIR, uuid.uuid4().hex)
+    _, digest = await stream_upload_to_disk(file, temp_path, max_size)
+    try:
+        await run_in_threadpool(
+            _place_blob, temp_path, os.path.join(BLOB_DIR, blob_path(digest, extension))
         )
-    
-    # Generate unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_ext = file.filename.split(".")[-1]
-    filename = f"report_{timestamp}.{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        buffer.write(file.file.read())
-    
-    return filename, f"/{UPLOAD_DIR}/{filename}"
\ No newline at end of file
+    except BaseException:
+        await run_in_threadpool(_remove_if_exists, temp_path)
+        raise
+
+    return digest, blob_url(digest, extension)
+
+def _copy_and_hash(source_path: str, target_path: str) -> str:
+    Path(target_path).parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            target.write(chunk)
+    return digest.hexdigest()
+
+async def save_file_as_blob(path: str, content_type: str) -> Tuple[str, str]:
+    """Copy a fully received file into the blob store, like save_image_blob.
+
+    ``path`` is left in place, so the caller can retry if whatever it does
+    next fails. The copy goes through BLOB_TMP_DIR, which may be on another
+    filesystem than ``path``, and is renamed into place.
+    """
+    extension = IMAGE_EXTENSIONS[content_type]
+    temp_path = os.path.join(BLOB_TMP_DIR, uuid.uuid4().hex)
+    try:
+        digest = await run_in_threadpool(_copy_and_hash, path, temp_path)
+        await run_in_threadpool(_place_blob, temp_path, os.path.join(BLOB_DIR, blob_path(digest, extension)))
+    except BaseException:
+        await run_in_threadpool(_remove_if_exists, temp_path)
+        raise
+    return digest, blob_url(digest, extension)
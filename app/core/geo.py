@@ -0,0 +1,138 @@
+import math
+from typing import List, Optional, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+
+# Stored geohash length; ~1.2km x 0.6km cells
+GEOHASH_PRECISION = 6
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+def geohash_for(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    """Stored geohash for an optional coordinate pair"""
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """(latitude, longitude) extent of a geohash cell at ``precision``"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+# Most index ranges a search may scan, and most cells enumerated to find them;
+# the finest precision within both is used
+MAX_COVERING_RANGES = 32
+MAX_COVERING_CELLS = 1024
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) of the circle around a point.
+
+    min_lon is greater than max_lon when the box crosses the antimeridian,
+    and the longitudes are -180..180 when the circle contains a pole.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    lat = math.radians(latitude)
+    min_lat, max_lat = lat - angular, lat + angular
+    if min_lat <= -math.pi / 2 or max_lat >= math.pi / 2:
+        return max(math.degrees(min_lat), -90.0), min(math.degrees(max_lat), 90.0), -180.0, 180.0
+    # Widest longitude span is not at the centre's latitude but where the
+    # circle's tangent meridians touch it
+    d_lon = math.degrees(math.asin(min(math.sin(angular) / math.cos(lat), 1.0)))
+    if d_lon >= 180.0:
+        return math.degrees(min_lat), math.degrees(max_lat), -180.0, 180.0
+    min_lon = (longitude - d_lon + 180.0) % 360.0 - 180.0
+    max_lon = (longitude + d_lon + 180.0) % 360.0 - 180.0
+    return math.degrees(min_lat), math.degrees(max_lat), min_lon, max_lon
+
+def _grid_span(low: float, high: float, origin: float, size: float, count: int) -> List[int]:
+    """Indices of the cells of width ``size`` from ``origin`` that overlap [low, high], wrapping at ``count``"""
+    first = int((low - origin) // size)
+    last = int((high - origin) // size)
+    if high < low:
+        last += count
+    else:
+        last = min(last, count - 1)
+    return [index % count for index in range(first, min(last, first + count - 1) + 1)]
+
+def covering_cells(latitude: float, longitude: float, radius_km: float, precision: int) -> List[str]:
+    """Geohash cells at ``precision`` that overlap the circle's bounding box"""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    lat_size, lon_size = cell_size_degrees(precision)
+    rows = _grid_span(min_lat, max_lat, -90.0, lat_size, round(180.0 / lat_size))
+    columns = _grid_span(min_lon, max_lon, -180.0, lon_size, round(360.0 / lon_size))
+    if len(rows) * len(columns) > MAX_COVERING_CELLS:
+        return []
+    return sorted({
+        encode_geohash(-90.0 + (row + 0.5) * lat_size, -180.0 + (column + 0.5) * lon_size, precision)
+        for row in rows
+        for column in columns
+    })
+
+def covering_ranges(latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, str]]:
+    """Half-open [low, high) geohash ranges whose union covers the circle around a point.
+
+    Uses the finest precision (up to the stored one) whose cells over the
+    bounding box merge into at most MAX_COVERING_RANGES ranges, so the
+    area scanned stays close to the box instead of several times it.
+    ``high`` ends in '~', which sorts after every geohash character under
+    "C" collation.
+    """
+    for precision in range(GEOHASH_PRECISION, 1, -1):
+        ranges = _merge_cells(covering_cells(latitude, longitude, radius_km, precision))
+        if ranges and len(ranges) <= MAX_COVERING_RANGES:
+            return ranges
+    return _merge_cells(covering_cells(latitude, longitude, radius_km, 1))
+
+def _merge_cells(cells: List[str]) -> List[Tuple[str, str]]:
+    """Cells of one precision as ranges, cells consecutive in Z-order sharing one"""
+    ranges: List[Tuple[str, str]] = []
+    previous = None
+    for cell in cells:
+        value = 0
+        for char in cell:
+            value = value * 32 + _BASE32.index(char)
+        if previous is not None and value == previous + 1:
+            ranges[-1] = (ranges[-1][0], cell + "~")
+        else:
+            ranges.append((cell, cell + "~"))
+        previous = value
+    return ranges
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, update
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.matching import collector_index
+from app.models.collector import CollectorProfile, CollectorStatusEnum
+
+logger = logging.getLogger(__name__)
+
+class HeartbeatBuffer:
+    """Write-behind buffer for collector status heartbeats.
+
+    Heartbeats only touch memory. Every ``flush_interval`` seconds the
+    profiles whose status changed are written with one UPDATE per status,
+    so a collector pinging every few seconds with the same status costs
+    one write per ``timeout / 3`` seconds, to refresh its ``last_seen_at``.
+    Collectors not heard from for ``timeout`` seconds are expired to
+    OFFLINE, in memory by the process that heard them and in SQL from
+    ``last_seen_at`` by every process, so collectors whose process died or
+    restarted expire as well. Rows that never had a heartbeat keep their
+    status. ``status_of`` serves the in-memory view, which is always at
+    least as fresh as the database.
+    """
+
+    def __init__(self, flush_interval: float, timeout: float):
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.seen_refresh = timeout / 3
+        # last_seen_at lags a live collector by up to this much, so the SQL
+        # sweep allows for it rather than expiring collectors still heard from
+        self._sweep_after = timedelta(seconds=timeout + self.seen_refresh + flush_interval)
+        self._live: Dict[int, Tuple[CollectorStatusEnum, float]] = {}
+        self._dirty: Dict[int, CollectorStatusEnum] = {}
+        # When last_seen_at was last written for each live collector
+        self._seen_written: Dict[int, float] = {}
+        self._last_sweep = float("-inf")
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.heartbeats = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.expired = 0
+        self.swept = 0
+        self.last_flush_seconds = 0.0
+
+    def record(self, collector_id: int, status: CollectorStatusEnum) -> None:
+        self.heartbeats += 1
+        status = CollectorStatusEnum(status)
+        previous = self._live.get(collector_id)
+        self._live[collector_id] = (status, time.monotonic())
+        if previous is None or previous[0] != status:
+            self._dirty[collector_id] = status
+            collector_index.set_status(collector_id, status)
+
+    def status_of(self, collector_id: int) -> Optional[CollectorStatusEnum]:
+        """Latest known status, or None if this process has no live heartbeat for the collector"""
+        entry = self._live.get(collector_id)
+        if entry is None or time.monotonic() - entry[1] > self.timeout:
+            return None
+        return entry[0]
+
+    def statuses(self) -> Dict[int, CollectorStatusEnum]:
+        """Every status this process knows of that may not be in the database yet"""
+        known = dict(self._dirty)
+        known.update((collector_id, status) for collector_id, (status, _) in self._live.items())
+        return known
+
+    def pending_statuses(self) -> Dict[int, CollectorStatusEnum]:
+        """Live statuses not written yet, i.e. where ``status_of`` and the database disagree"""
+        return {collector_id: status for collector_id, status in self._dirty.items() if collector_id in self._live}
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.timeout
+        for collector_id, (status, last_seen) in list(self._live.items()):
+            if last_seen < cutoff:
+                del self._live[collector_id]
+                self._seen_written.pop(collector_id, None)
+                self.expired += 1
+                if status != CollectorStatusEnum.OFFLINE:
+                    self._dirty[collector_id] = CollectorStatusEnum.OFFLINE
+                    collector_index.set_status(collector_id, CollectorStatusEnum.OFFLINE)
+
+    def _seen_due(self, now: float) -> Dict[int, CollectorStatusEnum]:
+        """Live collectors heard from since last_seen_at was written, and not for ``seen_refresh``"""
+        due = {}
+        for collector_id, (status, last_seen) in self._live.items():
+            written = self._seen_written.get(collector_id)
+            if written is None or (last_seen > written and now - written >= self.seen_refresh):
+                due[collector_id] = status
+        return due
+
+    async def flush(self, sweep: bool = False) -> int:
+        """Write pending status changes and due last_seen_at refreshes; returns the number of rows updated.
+
+        Also runs the SQL expiry sweep every ``seen_refresh`` seconds, or
+        now if ``sweep`` is set.
+        """
+        async with self._flush_lock:
+            self._expire()
+            now = time.monotonic()
+            seen = self._seen_due(now)
+            sweep = sweep or now - self._last_sweep >= self.seen_refresh
+            if not self._dirty and not seen and not sweep:
+                return 0
+            pending, self._dirty = self._dirty, {}
+            by_status = defaultdict(list)
+            for collector_id, status in {**pending, **seen}.items():
+                by_status[status, collector_id in seen].append(collector_id)
+
+            start = time.perf_counter()
+            written = 0
+            swept = []
+            try:
+                async with AsyncSessionLocal() as session:
+                    for (status, touch), collector_ids in by_status.items():
+                        stmt = update(CollectorProfile).where(CollectorProfile.id.in_(collector_ids))
+                        if touch:
+                            # updated_at is the ETag version; only a status change bumps it
+                            stmt = stmt.values(
+                                status=status,
+                                last_seen_at=func.now(),
+                                updated_at=case(
+                                    (CollectorProfile.status != status, func.now()),
+                                    else_=CollectorProfile.updated_at
+                                )
+                            )
+                        else:
+                            # Rows already in this status are left alone to avoid index churn
+                            stmt = stmt.where(CollectorProfile.status != status).values(status=status, updated_at=func.now())
+                        result = await session.execute(stmt.execution_options(synchronize_session=False))
+                        written += result.rowcount
+                    if sweep:
+                        result = await session.execute(
+                            update(CollectorProfile)
+                            .where(
+                                CollectorProfile.status != CollectorStatusEnum.OFFLINE,
+                                CollectorProfile.last_seen_at < func.now() - self._sweep_after
+                            )
+                            .values(status=CollectorStatusEnum.OFFLINE, updated_at=func.now())
+                            .returning(CollectorProfile.id)
+                            .execution_options(synchronize_session=False)
+                        )
+                        swept = result.scalars().all()
+                    await session.commit()
+            except BaseException:
+                # Keep the changes for the next flush unless a newer heartbeat replaced them
+                for collector_id, status in pending.items():
+                    self._dirty.setdefault(collector_id, status)
+                raise
+            for collector_id in seen:
+                if collector_id in self._live:
+                    self._seen_written[collector_id] = now
+            for collector_id in swept:
+                # Heard by another process that stopped, or before a restart
+                if collector_id not in self._live:
+                    collector_index.set_status(collector_id, CollectorStatusEnum.OFFLINE)
+            if sweep:
+                self._last_sweep = now
+                self.swept += len(swept)
+            self.flushes += 1
+            self.rows_written += written + len(swept)
+            self.last_flush_seconds = time.perf_counter() - start
+            return written + len(swept)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Heartbeat flush failed: {str(e)}")
+
+    def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush, write whatever is still pending and expire stale rows"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await self.flush(sweep=True)
+        except Exception as e:
+            logger.error(f"Final heartbeat flush failed: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "live": len(self._live),
+            "pending": len(self._dirty),
+            "heartbeats": self.heartbeats,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "expired": self.expired,
+            "swept": self.swept,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 2),
+        }
+
+heartbeats = HeartbeatBuffer(settings.HEARTBEAT_FLUSH_INTERVAL_SECONDS, settings.HEARTBEAT_TIMEOUT_SECONDS)
+# Rebuilds of the match index read the database, which lags these statuses
+collector_index.status_overlay = heartbeats.statuses
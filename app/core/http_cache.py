@@ -0,0 +1,45 @@
+import hashlib
+from typing import Dict, Iterable, Mapping, Optional
+
+from fastapi import Request, Response
+
+# Clients may keep a copy but must revalidate it on every use
+CACHE_CONTROL = "no-cache"
+
+def weak_etag(*parts) -> str:
+    """Weak ETag over version parts, e.g. (id, updated_at) of every row in a response.
+
+    Weak because the body is equivalent rather than byte-identical: the tag
+    does not change if serialization does.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+def rows_etag(rows: Iterable, *extra) -> str:
+    """Weak ETag for a page of rows having ``id`` and ``updated_at``"""
+    return weak_etag(*extra, *((row.id, row.updated_at) for row in rows))
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check using the weak comparison RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def cache_headers(etag: str, headers: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+    return {**(headers or {}), "ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+def not_modified(request: Request, etag: str, headers: Optional[Mapping[str, str]] = None) -> Optional[Response]:
+    """A bodiless 304 if the client already has ``etag``, otherwise None"""
+    if not etag_matches(request, etag):
+        return None
+    return Response(status_code=304, headers=cache_headers(etag, headers))
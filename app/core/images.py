@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.file_handling import BLOB_DIR
+
+# Longest edge in pixels; stored next to the original as <sha256>.<name>.webp
+IMAGE_VARIANTS: Dict[str, int] = {"thumb": 320, "medium": 960}
+VARIANT_QUALITY = 80
+
+def image_variant_url(image_url: Optional[str], variant: str) -> Optional[str]:
+    """URL of a resized variant, or None for images stored outside the blob store"""
+    if not image_url or not image_url.startswith(f"/{BLOB_DIR}/"):
+        return None
+    return f"{os.path.splitext(image_url)[0]}.{variant}.webp"
+
+def render_variants(source_path: str) -> List[str]:
+    """Write the WebP variants of ``source_path`` that do not exist yet.
+
+    Runs in a worker process. Returns the paths written.
+    """
+    # Imported here so the web process never loads Pillow
+    from PIL import Image, ImageOps
+
+    base = os.path.splitext(source_path)[0]
+    missing = {
+        name: size for name, size in IMAGE_VARIANTS.items()
+        if not os.path.exists(f"{base}.{name}.webp")
+    }
+    written = []
+    if not missing:
+        return written
+
+    with Image.open(source_path) as image:
+        # Let the JPEG decoder downscale while decoding
+        largest = max(missing.values())
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+        for name, size in sorted(missing.items(), key=lambda item: -item[1]):
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.LANCZOS)
+            target = f"{base}.{name}.webp"
+            partial = f"{target}.part"
+            variant.save(partial, "WEBP", quality=VARIANT_QUALITY, method=4)
+            os.replace(partial, target)
+            written.append(target)
+    return written
+
+class ImageVariantGenerator:
+    """Generates image variants in a process pool.
+
+    Called from the ``image_variants`` background job, so requests never
+    wait for it; clients should fall back to the original image until the
+    variant exists.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the parent runs an event loop and several threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def generate(self, image_url: str) -> List[str]:
+        """Render the missing variants of an uploaded image; raises on failure"""
+        source_path = image_url.lstrip("/")
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            written = await loop.run_in_executor(self._get_executor(), render_variants, source_path)
+            self.completed += 1
+            return written
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+image_variants = ImageVariantGenerator(settings.IMAGE_VARIANT_WORKERS)
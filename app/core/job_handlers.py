@@ -0,0 +1,8 @@
+from app.core.images import image_variants
+from app.core.jobs import job_handler
+
+IMAGE_VARIANTS_JOB = "image_variants"
+
+@job_handler(IMAGE_VARIANTS_JOB)
+async def generate_image_variants(payload: dict) -> None:
+    await image_variants.generate(payload["image_url"])
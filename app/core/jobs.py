@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, event, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job, JobStatusEnum
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+def job_handler(kind: str):
+    """Register the coroutine that runs jobs of ``kind``"""
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+def enqueue(db: AsyncSession, kind: str, payload: dict, delay_seconds: float = 0.0) -> Job:
+    """Add a job to the caller's transaction.
+
+    Nothing is committed here: the job becomes visible to workers together
+    with the rows it refers to, or not at all if the request rolls back.
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        status=JobStatusEnum.PENDING,
+        attempts=0,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+    if delay_seconds:
+        job.run_after = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    db.add(job)
+    db.info["jobs_enqueued"] = True
+    return job
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session: Session):
+    # Skip the poll interval when this process just committed new work
+    if session.info.pop("jobs_enqueued", False):
+        job_runner.wake()
+
+class JobRunner:
+    """Pool of asyncio workers that claim jobs with FOR UPDATE SKIP LOCKED.
+
+    Any number of workers, in any number of processes, can poll the same
+    table; SKIP LOCKED hands each due job to exactly one of them. Failed
+    jobs are retried with exponential backoff until ``max_attempts``. A
+    running job's lock is refreshed every ``lock_timeout / 3`` seconds, so
+    only a job left RUNNING by a crashed worker has a lock older than
+    ``lock_timeout``, and is picked up again. DONE and FAILED jobs are
+    deleted ``retention`` seconds after they finish.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        retry_backoff: float,
+        lock_timeout: float,
+        retention: float,
+        purge_interval: float,
+        purge_batch_size: int = 1000
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.lock_timeout = lock_timeout
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self.purge_batch_size = purge_batch_size
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.started_at: Optional[float] = None
+        self.running = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.total_queue_latency = 0.0
+        self.max_queue_latency = 0.0
+        self.total_run_time = 0.0
+        self.lock_refreshes = 0
+        self.purged = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.started_at = time.monotonic()
+        self._tasks = [loop.create_task(self._work(i)) for i in range(self.workers)]
+        self._tasks.append(loop.create_task(self._purge_periodically()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self, worker_id: int) -> None:
+        while True:
+            try:
+                claimed = await self._run_one()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed to claim a job: {str(e)}")
+                claimed = False
+            if claimed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def purge_finished(self) -> int:
+        """Delete DONE and FAILED jobs older than ``retention``; returns how many.
+
+        Deletes in batches so no statement holds many row locks, skipping
+        rows another process is already purging.
+        """
+        finished_before = func.now() - timedelta(seconds=self.retention)
+        purged = 0
+        while True:
+            batch = (
+                select(Job.id)
+                .where(Job.status.in_([JobStatusEnum.DONE, JobStatusEnum.FAILED]), Job.finished_at < finished_before)
+                .limit(self.purge_batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(delete(Job).where(Job.id.in_(batch)))
+                await session.commit()
+            purged += result.rowcount
+            self.purged += result.rowcount
+            if result.rowcount < self.purge_batch_size:
+                return purged
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                purged = await self.purge_finished()
+                if purged:
+                    logger.info(f"Purged {purged} finished jobs")
+            except Exception as e:
+                logger.error(f"Job purge failed: {str(e)}")
+
+    async def _keep_locked(self, job_id: int) -> None:
+        """Refresh a running job's lock so it is not taken for a crashed worker's"""
+        while True:
+            await asyncio.sleep(self.lock_timeout / 3)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == JobStatusEnum.RUNNING)
+                        .values(locked_at=func.now())
+                    )
+                    await session.commit()
+                self.lock_refreshes += 1
+            except Exception as e:
+                logger.error(f"Failed to refresh the lock of job {job_id}: {str(e)}")
+
+    async def _claim(self, session: AsyncSession):
+        stale_before = func.now() - timedelta(seconds=self.lock_timeout)
+        due = (
+            select(Job.id)
+            .where(or_(
+                (Job.status == JobStatusEnum.PENDING) & (Job.run_after <= func.now()),
+                (Job.status == JobStatusEnum.RUNNING) & (Job.locked_at < stale_before),
+            ))
+            .order_by(Job.run_after, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(Job)
+            .where(Job.id == due)
+            .values(status=JobStatusEnum.RUNNING, locked_at=func.now(), attempts=Job.attempts + 1)
+            .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.run_after)
+        )
+        job = result.one_or_none()
+        await session.commit()
+        return job
+
+    async def _run_one(self) -> bool:
+        async with AsyncSessionLocal() as session:
+            job = await self._claim(session)
+            if job is None:
+                return False
+
+            queue_latency = max((datetime.now(timezone.utc) - job.run_after).total_seconds(), 0.0)
+            self.total_queue_latency += queue_latency
+            self.max_queue_latency = max(self.max_queue_latency, queue_latency)
+
+            self.running += 1
+            start = time.perf_counter()
+            error = None
+            keep_locked = asyncio.create_task(self._keep_locked(job.id))
+            try:
+                handler = _handlers.get(job.kind)
+                if handler is None:
+                    raise LookupError(f"No handler registered for job kind {job.kind!r}")
+                await handler(job.payload)
+            except Exception as e:
+                error = e
+            finally:
+                keep_locked.cancel()
+                self.running -= 1
+                self.total_run_time += time.perf_counter() - start
+
+            if error is None:
+                self.succeeded += 1
+                values = {"status": JobStatusEnum.DONE, "finished_at": func.now(), "last_error": None}
+            elif job.attempts < job.max_attempts:
+                self.retried += 1
+                # Exponential backoff with jitter so failed jobs do not retry in lockstep
+                delay = self.retry_backoff * (2 ** (job.attempts - 1)) * random.uniform(0.8, 1.2)
+                logger.warning(f"Job {job.id} ({job.kind}) failed, retrying in {delay:.1f}s: {str(error)}")
+                values = {
+                    "status": JobStatusEnum.PENDING,
+                    "run_after": func.now() + timedelta(seconds=delay),
+                    "locked_at": None,
+                    "last_error": str(error),
+                }
+            else:
+                self.failed += 1
+                logger.error(f"Job {job.id} ({job.kind}) failed permanently: {str(error)}")
+                values = {"status": JobStatusEnum.FAILED, "finished_at": func.now(), "last_error": str(error)}
+
+            await session.execute(update(Job).where(Job.id == job.id).values(**values))
+            await session.commit()
+            return True
+
+    def stats(self) -> dict:
+        finished = self.succeeded + self.retried + self.failed
+        uptime = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "jobs_per_minute": round(finished / uptime * 60, 2) if uptime else 0.0,
+            "avg_queue_latency_ms": round(self.total_queue_latency / finished * 1000, 2) if finished else 0.0,
+            "max_queue_latency_ms": round(self.max_queue_latency * 1000, 2),
+            "avg_run_time_ms": round(self.total_run_time / finished * 1000, 2) if finished else 0.0,
+            "lock_refreshes": self.lock_refreshes,
+            "purged": self.purged,
+        }
+
+job_runner = JobRunner(
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    lock_timeout=settings.JOB_LOCK_TIMEOUT_SECONDS,
+    retention=settings.JOB_RETENTION_SECONDS,
+    purge_interval=settings.JOB_PURGE_INTERVAL_SECONDS,
+)
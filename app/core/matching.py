@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_right
+from functools import reduce
+from operator import or_
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Ratings are bucketed to one decimal for ranking
+RATING_TIERS = 10
+
+def _key(value) -> str:
+    """Enum members and free-text values (working days) compared case-insensitively"""
+    return str(getattr(value, "value", value)).strip().upper()
+
+def _bits_from_slots(slots: List[int], size: int) -> int:
+    # Building through a bytearray is linear; OR-ing 1 << slot per row is quadratic
+    buffer = bytearray((size + 7) // 8)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+def _iter_slots(bits: int):
+    """Set bit positions, lowest first"""
+    # str.find scans in C; cheaper than peeling bits off a large int one at a time
+    digits = bin(bits)[:1:-1]
+    position = digits.find("1")
+    while position != -1:
+        yield position
+        position = digits.find("1", position + 1)
+
+class _Snapshot:
+    """One generation of the index; replaced wholesale by a rebuild"""
+
+    CATEGORICAL = ("waste_type", "quantity", "day", "status")
+    PRICE_BANDS = 64
+
+    def __init__(self, band_edges: Optional[Dict[str, List[int]]] = None):
+        self.slot_of: Dict[int, int] = {}
+        self.ids: List[Optional[int]] = []
+        self.ratings: List[float] = []
+        self.prices: Dict[str, List[int]] = {"price_min": [], "price_max": []}
+        self.free_slots: List[int] = []
+        self.live = 0
+        # Lower bound of each price band; prices are bucketed so a range
+        # filter ORs at most PRICE_BANDS bitsets whatever the spread of values
+        self.band_edges = band_edges or {"price_min": [], "price_max": []}
+        # attribute -> value (or price band / rating tier) -> bitset of slots
+        self.bitsets: Dict[str, Dict] = {
+            "waste_type": {}, "quantity": {}, "day": {}, "status": {},
+            "price_min": {}, "price_max": {}, "rating": {},
+        }
+
+    def _band(self, name: str, price: float) -> int:
+        return max(bisect_right(self.band_edges[name], price) - 1, 0)
+
+    def values_of(self, row) -> Dict[str, Iterable]:
+        return {
+            "waste_type": {_key(v) for v in row["waste_types"] or []},
+            "quantity": {_key(v) for v in row["quantity_accepted"] or []},
+            "day": {_key(v) for v in row["working_days"] or []},
+            "status": {_key(row["status"])},
+            "price_min": {self._band("price_min", row["price_min"])},
+            "price_max": {self._band("price_max", row["price_max"])},
+            "rating": {round((row["average_rating"] or 0.0) * RATING_TIERS)},
+        }
+
+    @classmethod
+    def build(cls, rows: List) -> "_Snapshot":
+        band_edges = {}
+        for name in ("price_min", "price_max"):
+            distinct = sorted({row[name] for row in rows})
+            # Rounded up, so there are never more than PRICE_BANDS edges
+            step = max(-(-len(distinct) // cls.PRICE_BANDS), 1)
+            band_edges[name] = distinct[::step]
+        snapshot = cls(band_edges)
+
+        slots_by_value: Dict[str, Dict] = {name: {} for name in snapshot.bitsets}
+        for slot, row in enumerate(rows):
+            snapshot._place(row, slot)
+            for name, values in snapshot.values_of(row).items():
+                for value in values:
+                    slots_by_value[name].setdefault(value, []).append(slot)
+        size = len(rows)
+        snapshot.live = (1 << size) - 1
+        for name, by_value in slots_by_value.items():
+            snapshot.bitsets[name] = {value: _bits_from_slots(slots, size) for value, slots in by_value.items()}
+        return snapshot
+
+    def _place(self, row, slot: int) -> None:
+        """Record the per-slot fields of ``row``, appending when ``slot`` is new"""
+        fields = (
+            (self.ids, row["id"]),
+            (self.ratings, row["average_rating"] or 0.0),
+            (self.prices["price_min"], row["price_min"]),
+            (self.prices["price_max"], row["price_max"]),
+        )
+        for column, value in fields:
+            if slot == len(column):
+                column.append(value)
+            else:
+                column[slot] = value
+        self.slot_of[row["id"]] = slot
+
+    def remove(self, collector_id: int) -> None:
+        slot = self.slot_of.pop(collector_id, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        mask = ~bit
+        self.live &= mask
+        # Categorical values are few, so test each; the rest are known from the slot
+        for name in self.CATEGORICAL:
+            by_value = self.bitsets[name]
+            for value, bits in by_value.items():
+                if bits & bit:
+                    by_value[value] = bits & mask
+        own = (
+            ("price_min", self._band("price_min", self.prices["price_min"][slot])),
+            ("price_max", self._band("price_max", self.prices["price_max"][slot])),
+            ("rating", round(self.ratings[slot] * RATING_TIERS)),
+        )
+        for name, value in own:
+            by_value = self.bitsets[name]
+            if value in by_value:
+                by_value[value] &= mask
+        self.ids[slot] = None
+        self.free_slots.append(slot)
+
+    def upsert(self, row) -> None:
+        self.remove(row["id"])
+        slot = self.free_slots.pop() if self.free_slots else len(self.ids)
+        self._place(row, slot)
+        bit = 1 << slot
+        self.live |= bit
+        for name, values in self.values_of(row).items():
+            by_value = self.bitsets[name]
+            for value in values:
+                by_value[value] = by_value.get(value, 0) | bit
+
+    def set_status(self, collector_id: int, status) -> None:
+        slot = self.slot_of.get(collector_id)
+        if slot is None:
+            return
+        bit = 1 << slot
+        by_status = self.bitsets["status"]
+        for value, bits in by_status.items():
+            if bits & bit:
+                by_status[value] = bits & ~bit
+        key = _key(status)
+        by_status[key] = by_status.get(key, 0) | bit
+
+    def _price_filter(self, candidates: int, name: str, price: float) -> int:
+        """Candidates with price_min <= price (or price_max >= price).
+
+        Bands entirely on the accepted side are taken whole; only the band
+        containing ``price`` is checked slot by slot.
+        """
+        by_band = self.bitsets[name]
+        boundary = self._band(name, price)
+        if name == "price_min":
+            accepted = lambda band: band < boundary
+            passes = lambda value: value <= price
+        else:
+            accepted = lambda band: band > boundary
+            passes = lambda value: value >= price
+
+        inside = [bits for band, bits in by_band.items() if accepted(band)]
+        if len(inside) <= len(by_band) - len(inside):
+            result = candidates & reduce(or_, inside, 0)
+        else:
+            rejected = [bits for band, bits in by_band.items() if not accepted(band)]
+            result = candidates & ~reduce(or_, rejected, 0)
+
+        values = self.prices[name]
+        passing = [slot for slot in _iter_slots(candidates & by_band.get(boundary, 0)) if passes(values[slot])]
+        if passing:
+            result |= _bits_from_slots(passing, len(values))
+        return result
+
+    def match(self, waste_type, quantity, price: Optional[float], day: Optional[str], statuses, limit: int) -> List[int]:
+        bits = self.live
+        bits &= self.bitsets["waste_type"].get(_key(waste_type), 0)
+        if quantity is not None:
+            bits &= self.bitsets["quantity"].get(_key(quantity), 0)
+        if day:
+            bits &= self.bitsets["day"].get(_key(day), 0)
+        bits &= reduce(or_, (self.bitsets["status"].get(_key(s), 0) for s in statuses), 0)
+        if bits and price is not None:
+            bits = self._price_filter(bits, "price_min", price)
+            bits = self._price_filter(bits, "price_max", price)
+
+        # Highest rating tier first; exact rating then id order within a tier
+        matched: List[int] = []
+        for tier in sorted(self.bitsets["rating"], reverse=True):
+            in_tier = bits & self.bitsets["rating"][tier]
+            if not in_tier:
+                continue
+            slots = list(_iter_slots(in_tier))
+            slots.sort(key=lambda slot: (-self.ratings[slot], self.ids[slot]))
+            matched.extend(self.ids[slot] for slot in slots[:limit - len(matched)])
+            if len(matched) >= limit:
+                break
+        return matched
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+class CollectorMatchIndex:
+    """In-memory bitset index answering "which collectors can take this?".
+
+    Every collector profile gets a slot; each filterable value (waste
+    type, quantity, working day, status, price_min/price_max band, rating
+    tier) maps to a Python int whose set bits are the slots having it, so a
+    query is a handful of big-int ANDs plus an exact check of the slots in
+    the boundary price band. Local writes are applied with ``upsert``; a
+    periodic rebuild from the database picks up writes made by other
+    processes. Rebuilds never overlap.
+    """
+
+    def __init__(self):
+        self._snapshot = _Snapshot()
+        self._loaded = False
+        self._rebuilding = False
+        self._pending: List[Tuple[str, object]] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Serializes rebuilds: each one owns _rebuilding and _pending while it runs
+        self._rebuild_lock = asyncio.Lock()
+        # Statuses newer than the database (unflushed heartbeats); set by app.core.heartbeats
+        self.status_overlay: Callable[[], Dict[int, object]] = dict
+        self.last_rebuild_at: Optional[float] = None
+        self.last_rebuild_seconds = 0.0
+        self.queries = 0
+        self.total_query_time = 0.0
+
+    async def refresh(self, load_rows) -> None:
+        """Rebuild from ``await load_rows()``, waiting for any rebuild already running"""
+        async with self._rebuild_lock:
+            await self._rebuild(load_rows)
+
+    async def _rebuild(self, load_rows) -> None:
+        # Start recording before the rows are read: a write made while they
+        # load may be missing from them and must be replayed too
+        self._rebuilding = True
+        self._pending = []
+        start = time.perf_counter()
+        try:
+            rows = await load_rows()
+            snapshot = await run_in_threadpool(_Snapshot.build, rows)
+            # Replay writes that happened while the new snapshot was being built
+            for op, arg in self._pending:
+                if op == "upsert":
+                    snapshot.upsert(arg)
+                elif op == "status":
+                    snapshot.set_status(*arg)
+                else:
+                    snapshot.remove(arg)
+            # Statuses set before the rebuild but not flushed yet are not in the rows either
+            for collector_id, status in self.status_overlay().items():
+                snapshot.set_status(collector_id, status)
+            self._snapshot = snapshot
+            self._loaded = True
+        finally:
+            self._rebuilding = False
+            self._pending = []
+        self.last_rebuild_at = time.time()
+        self.last_rebuild_seconds = time.perf_counter() - start
+
+    def upsert(self, row) -> None:
+        """Apply a created or changed profile; ``row`` is a mapping of the collector_profiles columns"""
+        self._snapshot.upsert(row)
+        if self._rebuilding:
+            self._pending.append(("upsert", row))
+
+    def remove(self, collector_id: int) -> None:
+        self._snapshot.remove(collector_id)
+        if self._rebuilding:
+            self._pending.append(("remove", collector_id))
+
+    def set_status(self, collector_id: int, status) -> None:
+        """Cheaper ``upsert`` for a status-only change"""
+        self._snapshot.set_status(collector_id, status)
+        if self._rebuilding:
+            self._pending.append(("status", (collector_id, status)))
+
+    async def ensure_loaded(self, load_rows) -> None:
+        """Build the index on first use if the background refresh has not yet"""
+        if self._loaded:
+            return
+        async with self._rebuild_lock:
+            if not self._loaded:
+                await self._rebuild(load_rows)
+
+    def match(
+        self,
+        waste_type,
+        quantity=None,
+        price: Optional[float] = None,
+        day: Optional[str] = None,
+        statuses: Iterable = ("AVAILABLE",),
+        limit: int = 10
+    ) -> List[int]:
+        """Collector profile ids that accept the given listing, best rated first"""
+        start = time.perf_counter()
+        try:
+            return self._snapshot.match(waste_type, quantity, price, day, statuses, limit)
+        finally:
+            self.queries += 1
+            self.total_query_time += time.perf_counter() - start
+
+    async def _refresh_periodically(self, load_rows, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh(load_rows)
+            except Exception as e:
+                logger.error(f"Collector match index rebuild failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def start_refresh(self, load_rows, interval: float) -> None:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_periodically(load_rows, interval))
+
+    def stop_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "collectors": len(self._snapshot),
+            "last_rebuild_at": self.last_rebuild_at,
+            "last_rebuild_ms": round(self.last_rebuild_seconds * 1000, 2),
+            "queries": self.queries,
+            "avg_query_ms": round(self.total_query_time / self.queries * 1000, 3) if self.queries else 0.0,
+        }
+
+collector_index = CollectorMatchIndex()
@@ -0,0 +1,52 @@
+import logging
+from typing import Any, List, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+class ResponseSerializer:
+    """Validates handler output once and encodes it straight to JSON bytes.
+
+    Returning the resulting Response skips FastAPI's second pass over the
+    data (response_model validation plus jsonable_encoder). Keep
+    ``response_model`` on the route so the OpenAPI schema stays the same.
+    """
+
+    def __init__(self, response_type: Any):
+        self._adapter = TypeAdapter(response_type)
+
+    def validate(self, data: Any) -> Any:
+        return self._adapter.validate_python(data, from_attributes=True)
+
+    def response(self, data: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+        return Response(
+            content=self._adapter.dump_json(self.validate(data)),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json"
+        )
+
+class ListSerializer(ResponseSerializer):
+    """ResponseSerializer for ``List[item_type]`` that can drop items failing validation"""
+
+    def __init__(self, item_type: Any, skip_invalid: bool = False):
+        super().__init__(List[item_type])
+        self._item_adapter = TypeAdapter(item_type)
+        self._skip_invalid = skip_invalid
+
+    def validate(self, data: Any) -> Any:
+        try:
+            return super().validate(data)
+        except ValidationError:
+            if not self._skip_invalid:
+                raise
+        # Slow path: validate one by one so a bad row does not fail the whole page
+        items = []
+        for item in data:
+            try:
+                items.append(self._item_adapter.validate_python(item, from_attributes=True))
+            except ValidationError as e:
+                logger.error(f"Skipping item {getattr(item, 'id', '?')} that failed validation: {str(e)}")
+        return items
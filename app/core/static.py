@@ -0,0 +1,140 @@
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# <sha256>.<ext> or <sha256>.<variant>.webp inside uploads/blobs/ab/cd/
+_BLOB_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:\.(?P<variant>[a-z]+))?\.[a-z0-9]+$")
+_RANGE = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Anything else may be overwritten in place, so make clients revalidate
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+def content_etag(full_path: str) -> Optional[str]:
+    """Strong ETag for a content-addressed blob, derived from its path alone"""
+    name = os.path.basename(full_path)
+    match = _BLOB_NAME.match(name)
+    if match is None or name.endswith(".part"):
+        return None
+    digest = match.group("digest")
+    shard = os.path.dirname(full_path)
+    if os.path.basename(shard) != digest[2:4] or os.path.basename(os.path.dirname(shard)) != digest[:2]:
+        return None
+    variant = match.group("variant")
+    return f'"{digest}.{variant}"' if variant else f'"{digest}"'
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single ``bytes=`` range.
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges; the full file is served instead) and raises 416 when the range
+    cannot be satisfied.
+    """
+    match = _RANGE.match(range_header.strip())
+    if match is None:
+        return None
+    start, end = match.group("start"), match.group("end")
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise _range_not_satisfiable(size)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise _range_not_satisfiable(size)
+    return start, end
+
+def _range_not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+class RangeFileResponse(FileResponse):
+    """206 response carrying one byte range of a file"""
+
+    def __init__(self, path: str, start: int, end: int, **kwargs):
+        super().__init__(path, status_code=206, **kwargs)
+        self.start = start
+        self.end = end
+        self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank underneath us; end the body anyway
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles for /uploads with cache validators and range support.
+
+    Content-addressed blobs never change, so they get a strong ETag derived
+    from their hash and ``Cache-Control: immutable``. Other files keep the
+    default mtime/size ETag and must be revalidated. Conditional requests
+    are answered with 304 and a single ``Range`` with 206 (or 416).
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in path.replace(os.sep, "/").split("/")):
+            # Dot-directories (BLOB_TMP_DIR) hold uploads still being written
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        if full_path.endswith(".part"):
+            # Upload still being written
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        etag = content_etag(full_path)
+        if etag is not None:
+            response.headers["etag"] = etag
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+        response.headers["accept-ranges"] = "bytes"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if range_header and status_code == 200 and self._if_range_matches(request_headers, response.headers):
+            byte_range = parse_range(range_header, stat_result.st_size)
+            if byte_range is not None:
+                start, end = byte_range
+                ranged = RangeFileResponse(full_path, start, end, stat_result=stat_result)
+                for name in ("etag", "cache-control", "accept-ranges"):
+                    ranged.headers[name] = response.headers[name]
+                return ranged
+        return response
+
+    @staticmethod
+    def _if_range_matches(request_headers: Headers, response_headers) -> bool:
+        """A Range is only honoured if If-Range (when sent) still names this version"""
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        return if_range.strip() in (response_headers.get("etag"), response_headers.get("last-modified"))
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+UPLOAD_LENGTH_HEADER = "Upload-Length"
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+class UploadSessionStore:
+    """Resumable uploads kept on disk as ``<id>.json`` metadata plus an append-only ``<id>.part``.
+
+    The size of the .part file is the authoritative offset, so a chunk
+    that was cut off halfway still counts for the bytes that arrived and
+    the client resumes from there. Sessions idle for longer than
+    ``ttl_seconds`` are removed by the periodic cleanup. The directory must
+    not be under the public /uploads mount.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def data_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    async def create(self, user_id: int, size: int, content_type: str) -> dict:
+        session = {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "size": size,
+            "content_type": content_type,
+            "created_at": time.time(),
+        }
+        await run_in_threadpool(self._write_new, session)
+        return {**session, "offset": 0}
+
+    def _write_new(self, session: dict) -> None:
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        open(self.data_path(session["id"]), "wb").close()
+        with open(self._meta_path(session["id"]), "w") as meta:
+            json.dump(session, meta)
+
+    async def get(self, upload_id: str, user_id: int) -> Optional[dict]:
+        """The session with its current offset, or None if missing or not owned by ``user_id``"""
+        if not _SESSION_ID.match(upload_id):
+            return None
+        return await run_in_threadpool(self._read, upload_id, user_id)
+
+    def _read(self, upload_id: str, user_id: int) -> Optional[dict]:
+        try:
+            with open(self._meta_path(upload_id)) as meta:
+                session = json.load(meta)
+            offset = os.path.getsize(self.data_path(upload_id))
+        except (FileNotFoundError, ValueError):
+            return None
+        if session["user_id"] != user_id:
+            return None
+        return {**session, "offset": offset}
+
+    def lock(self, upload_id: str) -> asyncio.Lock:
+        """Serializes appends to and completion of one upload within this process.
+
+        Only take it for a session that was just found with ``get``; locks
+        are dropped by ``delete`` or ``drop_lock``.
+        """
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    def drop_lock(self, upload_id: str) -> None:
+        """Forget the lock of a session found missing while holding it"""
+        self._locks.pop(upload_id, None)
+
+    async def append(self, session: dict, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Append a chunk that starts at ``offset`` and return the new offset"""
+        upload_id = session["id"]
+        async with self.lock(upload_id):
+            path = self.data_path(upload_id)
+            try:
+                current = await run_in_threadpool(os.path.getsize, path)
+            except FileNotFoundError:
+                # Completed or expired while this request waited for the lock
+                self.drop_lock(upload_id)
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+            if offset != current:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Upload offset mismatch, expected {current}",
+                    headers={UPLOAD_OFFSET_HEADER: str(current)}
+                )
+            target = await run_in_threadpool(open, path, "ab")
+            try:
+                async for chunk in chunks:
+                    if current + len(chunk) > session["size"]:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Chunk goes past the declared upload size"
+                        )
+                    await run_in_threadpool(target.write, chunk)
+                    current += len(chunk)
+            finally:
+                # Bytes written before a dropped connection are kept
+                await run_in_threadpool(target.close)
+            return current
+
+    async def delete(self, upload_id: str) -> None:
+        self._locks.pop(upload_id, None)
+        await run_in_threadpool(self._remove_files, upload_id)
+
+    def _remove_files(self, upload_id: str) -> None:
+        for path in (self._meta_path(upload_id), self.data_path(upload_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _expired_ids(self) -> list:
+        """Sessions whose files have all been idle for longer than the TTL"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        last_activity: Dict[str, float] = {}
+        for name in names:
+            upload_id, _ = os.path.splitext(name)
+            try:
+                mtime = os.path.getmtime(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            last_activity[upload_id] = max(mtime, last_activity.get(upload_id, 0.0))
+        cutoff = time.time() - self.ttl_seconds
+        return [upload_id for upload_id, mtime in last_activity.items() if mtime < cutoff]
+
+    async def cleanup_expired(self) -> int:
+        expired = await run_in_threadpool(self._expired_ids)
+        for upload_id in expired:
+            lock = self._locks.get(upload_id)
+            if lock is not None and lock.locked():
+                continue
+            await self.delete(upload_id)
+        return len(expired)
+
+    async def _cleanup_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.cleanup_expired()
+                if removed:
+                    logger.info(f"Removed {removed} abandoned upload sessions")
+            except Exception as e:
+                logger.error(f"Upload session cleanup failed: {str(e)}")
+
+    def start_cleanup(self, interval: float) -> None:
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.get_running_loop().create_task(self._cleanup_periodically(interval))
+
+    def stop_cleanup(self) -> None:
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
+upload_sessions = UploadSessionStore(settings.UPLOAD_SESSION_DIR, settings.UPLOAD_SESSION_TTL_SECONDS)
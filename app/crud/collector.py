@@ -1,25 +1,34 @@
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, literal
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
 import logging
 
+from app.core.database import AsyncSessionLocal
+from app.core.geo import EARTH_RADIUS_KM, bounding_box, covering_ranges
 # Assuming these imports exist in your project
-from app.models.collector import CollectorProfile
+from app.models.collector import CollectorProfile, CollectorStatusEnum
 from app.models.user import User
 from app.schemas.collector import *
 
 logger = logging.getLogger(__name__)
  
-async def get_all_collectors_simple(db: AsyncSession) -> List:  # Replace with CollectorProfile
-    """Get all collectors without any relations or complex filtering"""
+async def get_all_collectors_simple(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> List:  # Replace with CollectorProfile
+    """Get collectors without any relations or complex filtering, paginated in SQL"""
     
     try:
-        logger.info("Fetching all collectors (simple)")
+        logger.info(f"Fetching collectors (simple): limit={limit}, offset={offset}")
         
-        # Simple query - no joins, no relations, just raw collector data
-        stmt = select(CollectorProfile)
+        # Simple query - no joins, no relations, just raw collector data.
+        # Ordered by id so limit/offset pages are stable.
+        stmt = select(CollectorProfile).order_by(CollectorProfile.id).offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit)
         result = await db.execute(stmt)
         collectors = result.scalars().all()
         
@@ -30,12 +39,31 @@ async def get_all_collectors_simple(db: AsyncSession) -> List:  # Replace with C
         logger.error(f"Error in get_all_collectors_simple: {str(e)}", exc_info=True)
         raise
 
+async def stream_all_collectors(batch_size: int = 500) -> AsyncIterator:
+    """Yield every collector_profiles row through a server-side cursor.
+
+    Rows arrive ``batch_size`` at a time, so memory stays flat however big the
+    table is. Uses its own session because a streaming response keeps reading
+    after the request's dependencies have been closed.
+    """
+    
+    async with AsyncSessionLocal() as session:
+        stmt = (
+            select(CollectorProfile.__table__)
+            .order_by(CollectorProfile.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(stmt)
+        async for row in result:
+            yield row
+
 async def get_collectors_with_optional_filters(
     db: AsyncSession, 
     location: Optional[str] = None,
     waste_type: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    fuzzy: bool = False
 ) -> List:  # Replace with CollectorProfile
     """Get collectors with optional simple filters, no relations"""
     
@@ -46,7 +74,12 @@ async def get_collectors_with_optional_filters(
         stmt = select(CollectorProfile)
         
         # Apply simple filters if provided
-        if location:
+        if location and fuzzy:
+            # Typo-tolerant match ranked by similarity; <% is served by the trigram index
+            stmt = stmt.where(literal(location).op("<%")(CollectorProfile.location))
+            stmt = stmt.order_by(func.word_similarity(location, CollectorProfile.location).desc())
+            logger.info(f"Applied fuzzy location filter: {location}")
+        elif location:
             stmt = stmt.where(CollectorProfile.location.ilike(f"%{location}%"))
             logger.info(f"Applied location filter: {location}")
         
@@ -68,6 +101,109 @@ async def get_collectors_with_optional_filters(
         logger.error(f"Error in get_collectors_with_optional_filters: {str(e)}", exc_info=True)
         raise
 
+def distance_km_expression(latitude: float, longitude: float):
+    """Haversine distance in SQL from a point to each collector, like app.core.geo.haversine_km"""
+    lat1, lon1 = func.radians(latitude), func.radians(longitude)
+    lat2, lon2 = func.radians(CollectorProfile.latitude), func.radians(CollectorProfile.longitude)
+    a = (
+        func.power(func.sin((lat2 - lat1) * 0.5), 2)
+        + func.cos(lat1) * func.cos(lat2) * func.power(func.sin((lon2 - lon1) * 0.5), 2)
+    )
+    # least() keeps rounding from pushing asin's argument past 1 for antipodes
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(func.sqrt(a), 1.0))
+
+async def get_nearby_collectors(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    waste_type: Optional[str] = None,
+    limit: int = 10,
+    status_overrides: Optional[Dict[int, CollectorStatusEnum]] = None
+) -> List:
+    """Nearest AVAILABLE collectors within radius_km, as (collector, distance_km) pairs.
+
+    Candidates come from range scans of the geohash index over cells about
+    the size of the search circle, trimmed to its bounding box; distance,
+    ordering and the limit are all applied in SQL. ``status_overrides``
+    are statuses newer than the stored ones (heartbeats not flushed yet)
+    and take precedence over them.
+    """
+    
+    try:
+        logger.info(f"Fetching collectors within {radius_km}km of ({latitude}, {longitude})")
+        
+        cell_filter = or_(*[
+            and_(CollectorProfile.geohash >= low, CollectorProfile.geohash < high)
+            for low, high in covering_ranges(latitude, longitude, radius_km)
+        ])
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        if min_lon <= max_lon:
+            lon_filter = CollectorProfile.longitude.between(min_lon, max_lon)
+        else:
+            # Box crosses the antimeridian
+            lon_filter = or_(CollectorProfile.longitude >= min_lon, CollectorProfile.longitude <= max_lon)
+        distance = distance_km_expression(latitude, longitude).label("distance_km")
+        
+        stmt = (
+            select(CollectorProfile, distance)
+            .where(cell_filter)
+            .where(CollectorProfile.latitude.between(min_lat, max_lat), lon_filter)
+        )
+        available = CollectorProfile.status == CollectorStatusEnum.AVAILABLE
+        if status_overrides:
+            now_available = [i for i, s in status_overrides.items() if s == CollectorStatusEnum.AVAILABLE]
+            not_available = [i for i, s in status_overrides.items() if s != CollectorStatusEnum.AVAILABLE]
+            if not_available:
+                available = and_(available, CollectorProfile.id.notin_(not_available))
+            if now_available:
+                available = or_(available, CollectorProfile.id.in_(now_available))
+        stmt = stmt.where(available)
+        if waste_type:
+            stmt = stmt.where(CollectorProfile.waste_types.contains([waste_type]))
+        stmt = stmt.where(distance <= radius_km).order_by(distance).limit(limit)
+        
+        result = await db.execute(stmt)
+        nearest = [(collector, distance_km) for collector, distance_km in result]
+        
+        logger.info(f"Returning {len(nearest)} collectors in range")
+        return nearest
+        
+    except Exception as e:
+        logger.error(f"Error in get_nearby_collectors: {str(e)}", exc_info=True)
+        raise
+
+# Attributes indexed by app.core.matching
+MATCH_INDEX_COLUMNS = (
+    CollectorProfile.id,
+    CollectorProfile.waste_types,
+    CollectorProfile.quantity_accepted,
+    CollectorProfile.working_days,
+    CollectorProfile.status,
+    CollectorProfile.price_min,
+    CollectorProfile.price_max,
+    CollectorProfile.average_rating,
+)
+
+async def load_collector_match_rows() -> List:
+    """Matching attributes of every profile, for rebuilding the match index.
+
+    Uses its own session because it runs from the background refresh task.
+    """
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(*MATCH_INDEX_COLUMNS))
+        return result.mappings().all()
+
+async def get_collectors_by_ids(db: AsyncSession, collector_ids: List[int]) -> List:
+    """Profiles for the given ids, in the order given"""
+    
+    if not collector_ids:
+        return []
+    result = await db.execute(select(CollectorProfile).where(CollectorProfile.id.in_(collector_ids)))
+    by_id = {collector.id: collector for collector in result.scalars().all()}
+    return [by_id[collector_id] for collector_id in collector_ids if collector_id in by_id]
+
 async def get_collector_by_id_simple(db: AsyncSession, collector_id) -> Optional:  # collector_id can be UUID or int
     """Get single collector by ID without relations"""
     
@@ -89,6 +225,15 @@ async def get_collector_by_id_simple(db: AsyncSession, collector_id) -> Optional
         logger.error(f"Error in get_collector_by_id_simple: {str(e)}", exc_info=True)
         raise
 
+async def get_collector_version(db: AsyncSession, collector_id):
+    """(id, updated_at, status) of a profile without loading it, or None if it does not exist"""
+    
+    result = await db.execute(
+        select(CollectorProfile.id, CollectorProfile.updated_at, CollectorProfile.status)
+        .where(CollectorProfile.id == collector_id)
+    )
+    return result.one_or_none()
+
 async def get_collector_by_id(db: AsyncSession, collector_id: UUID) -> Optional:  # Replace with CollectorProfile
     """Get collector by ID with improved error handling"""
     
@@ -1,10 +1,13 @@
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, and_, or_, tuple_, func, literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from app.core.geo import geohash_for
+from app.core.pagination import decode_cursor
 from app.models.marketplace import Listing, ListingStatusEnum
+from app.models.user import User
 from app.schemas.marketplace import ListingCreate, ListingUpdate, ListingSearchParams
 
 async def create_listing(db: AsyncSession, listing: ListingCreate, resident_id: int) -> Listing:
@@ -16,6 +19,9 @@ async def create_listing(db: AsyncSession, listing: ListingCreate, resident_id:
         price=listing.price,
         quantity=listing.quantity,
         location=listing.location,
+        latitude=listing.latitude,
+        longitude=listing.longitude,
+        geohash=geohash_for(listing.latitude, listing.longitude),
         image_url=listing.image_url,
         status=ListingStatusEnum.AVAILABLE
     )
@@ -32,24 +38,34 @@ async def get_listing(db: AsyncSession, listing_id: int) -> Optional[Listing]:
     )
     return result.scalar_one_or_none()
 
-async def get_listings(
-    db: AsyncSession,
-    search_params: ListingSearchParams,
-    include_sold: bool = False
-) -> List[Listing]:
-    query = select(Listing).options(
-        selectinload(Listing.resident),
-        selectinload(Listing.collector)
+async def get_listing_version(db: AsyncSession, listing_id: int):
+    """(id, updated_at) of a listing without loading it, or None if it does not exist"""
+    result = await db.execute(select(Listing.id, Listing.updated_at).where(Listing.id == listing_id))
+    return result.one_or_none()
+
+async def get_listing_match_criteria(db: AsyncSession, listing_id: int):
+    """The listing attributes collectors are matched on, or None if it does not exist"""
+    result = await db.execute(
+        select(Listing.waste_type, Listing.quantity, Listing.price).where(Listing.id == listing_id)
     )
-    
+    return result.one_or_none()
+
+def _apply_search_params(query, search_params: ListingSearchParams, include_sold: bool):
+    """Filters, ordering and pagination shared by the listing search queries"""
     # Build filters
     filters = []
     
     if search_params.waste_type:
         filters.append(Listing.waste_type == search_params.waste_type)
     
+    location_similarity = None
     if search_params.location:
-        filters.append(Listing.location.ilike(f"%{search_params.location}%"))
+        if search_params.fuzzy:
+            # Typo-tolerant match; the <% operator is served by the trigram index
+            filters.append(literal(search_params.location).op("<%")(Listing.location))
+            location_similarity = func.word_similarity(search_params.location, Listing.location)
+        else:
+            filters.append(Listing.location.ilike(f"%{search_params.location}%"))
     
     if search_params.min_price is not None:
         filters.append(Listing.price >= search_params.min_price)
@@ -62,45 +78,145 @@ async def get_listings(
     elif not include_sold:
         filters.append(Listing.status != ListingStatusEnum.SOLD)
     
+    # Keyset pagination: continue strictly after the last row of the previous page.
+    # Fuzzy results are ranked by similarity, so they page by offset instead.
+    use_cursor = bool(search_params.cursor) and location_similarity is None
+    if use_cursor:
+        cursor_created_at, cursor_id = decode_cursor(search_params.cursor)
+        filters.append(tuple_(Listing.created_at, Listing.id) < tuple_(cursor_created_at, cursor_id))
+    
     if filters:
         query = query.where(and_(*filters))
     
     # Add pagination
-    query = query.offset(search_params.offset).limit(search_params.limit)
+    if not use_cursor:
+        query = query.offset(search_params.offset)
+    query = query.limit(search_params.limit)
     
-    # Order by creation date (newest first)
-    query = query.order_by(Listing.created_at.desc())
+    # Best location match first when fuzzy, then newest first; id breaks ties so the cursor is stable
+    if location_similarity is not None:
+        query = query.order_by(location_similarity.desc())
+    query = query.order_by(Listing.created_at.desc(), Listing.id.desc())
+    return query
+
+async def get_listings(
+    db: AsyncSession,
+    search_params: ListingSearchParams,
+    include_sold: bool = False
+) -> List[Listing]:
+    query = select(Listing).options(
+        selectinload(Listing.resident),
+        selectinload(Listing.collector)
+    )
+    query = _apply_search_params(query, search_params, include_sold)
     
     result = await db.execute(query)
     return result.scalars().all()
 
-async def update_listing_status(
+# Columns needed by ListingSummary; the resident name comes from a join
+LISTING_SUMMARY_COLUMNS = (
+    Listing.id,
+    Listing.title,
+    Listing.waste_type,
+    Listing.price,
+    Listing.quantity,
+    Listing.location,
+    Listing.image_url,
+    Listing.status,
+    Listing.created_at,
+    Listing.updated_at,
+)
+
+async def get_listing_summaries(
     db: AsyncSession,
-    listing_id: int,
-    new_status: ListingStatusEnum,
-    collector_id: Optional[int] = None
-) -> Optional[Listing]:
-    listing = await get_listing(db, listing_id)
-    if not listing:
-        return None
-    
-    listing.status = new_status
-    listing.updated_at = datetime.utcnow()
+    search_params: ListingSearchParams,
+    include_sold: bool = False
+) -> list:
+    """Same search as get_listings, projected to the summary columns.
+
+    Returns plain rows (attribute access, no ORM identity map or
+    relationship loading) with the resident's name joined in.
+    """
+    query = (
+        select(*LISTING_SUMMARY_COLUMNS, User.full_name.label("resident_name"))
+        .join(User, User.id == Listing.resident_id)
+    )
+    query = _apply_search_params(query, search_params, include_sold)
     
+    result = await db.execute(query)
+    return result.all()
+
+class ListingStatusConflict(Exception):
+    """The listing is not in a state that allows the requested transition"""
+
+    def __init__(self, listing_id: int, current_status: ListingStatusEnum, new_status: ListingStatusEnum):
+        self.listing_id = listing_id
+        self.current_status = ListingStatusEnum(current_status)
+        self.new_status = ListingStatusEnum(new_status)
+        super().__init__(f"Listing {listing_id} is {self.current_status.value}, cannot move to {self.new_status.value}")
+
+def _status_transition(new_status: ListingStatusEnum, collector_id: Optional[int]):
+    """WHERE guard and SET values for moving a listing to new_status"""
     if new_status == ListingStatusEnum.RESERVED:
-        listing.collector_id = collector_id
-        listing.reserved_at = datetime.utcnow()
+        guard = Listing.status == ListingStatusEnum.AVAILABLE
+        values = {"collector_id": collector_id, "reserved_at": func.now()}
     elif new_status == ListingStatusEnum.SOLD:
-        listing.collector_id = collector_id
-        listing.sold_at = datetime.utcnow()
+        guard = or_(
+            Listing.status == ListingStatusEnum.AVAILABLE,
+            and_(Listing.status == ListingStatusEnum.RESERVED, Listing.collector_id == collector_id)
+        )
+        values = {"collector_id": collector_id, "sold_at": func.now()}
     elif new_status == ListingStatusEnum.AVAILABLE:
-        listing.collector_id = None
-        listing.reserved_at = None
-        listing.sold_at = None
-    
+        # Only the collector holding the reservation can release it
+        guard = and_(Listing.status == ListingStatusEnum.RESERVED, Listing.collector_id == collector_id)
+        values = {"collector_id": None, "reserved_at": None, "sold_at": None}
+    else:
+        # Collectors can only cancel a pickup they reserved themselves
+        guard = and_(Listing.status == ListingStatusEnum.RESERVED, Listing.collector_id == collector_id)
+        values = {}
+    return guard, {**values, "status": new_status, "updated_at": func.now()}
+
+async def update_listing_status(
+    db: AsyncSession,
+    listing_id: int,
+    new_status: ListingStatusEnum,
+    collector_id: Optional[int] = None
+):
+    """Apply a status transition as one conditional UPDATE ... RETURNING.
+
+    The WHERE clause checks the expected current status, so when two
+    collectors race for the same listing exactly one UPDATE matches. The
+    updated row comes back joined with the resident and collector names.
+    Returns None if the listing does not exist and raises
+    ListingStatusConflict if it exists but was in the wrong state.
+    """
+    guard, values = _status_transition(new_status, collector_id)
+    updated = (
+        update(Listing)
+        .where(Listing.id == listing_id, guard)
+        .values(**values)
+        .returning(*Listing.__table__.c)
+        .cte("updated")
+    )
+    resident = aliased(User)
+    collector = aliased(User)
+    stmt = (
+        select(updated, resident.full_name.label("resident_name"), collector.full_name.label("collector_name"))
+        .join(resident, resident.id == updated.c.resident_id)
+        .outerjoin(collector, collector.id == updated.c.collector_id)
+    )
+    result = await db.execute(stmt)
+    row = result.mappings().one_or_none()
     await db.commit()
-    await db.refresh(listing)
-    return listing
+    
+    if row is None:
+        current_status = (
+            await db.execute(select(Listing.status).where(Listing.id == listing_id))
+        ).scalar_one_or_none()
+        if current_status is None:
+            return None
+        raise ListingStatusConflict(listing_id, current_status, new_status)
+    return row
 
 async def update_listing(
     db: AsyncSession,
@@ -1,5 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
+from app.core.geo import geohash_for
+from app.core.pagination import decode_cursor
 from app.models.report import IllegalDumpReport
 from app.schemas.report import ReportCreate, ReportStatusEnum
 
@@ -8,6 +10,9 @@ async def create_report(db: AsyncSession, report: ReportCreate, user_id: int, im
         user_id=user_id,
         image_url=image_url,
         location=report.location,
+        latitude=report.latitude,
+        longitude=report.longitude,
+        geohash=geohash_for(report.latitude, report.longitude),
         description=report.description,
         waste_type=report.waste_type,
         severity=report.severity,
@@ -18,13 +23,33 @@ async def create_report(db: AsyncSession, report: ReportCreate, user_id: int, im
     await db.refresh(db_report)
     return db_report
 
-async def get_user_reports(db: AsyncSession, user_id: int, status: str = None):
-    query = select(IllegalDumpReport).where(IllegalDumpReport.user_id == user_id)
+def _user_reports_filter(user_id: int, status: str = None):
+    conditions = [IllegalDumpReport.user_id == user_id]
     if status:
-        query = query.where(IllegalDumpReport.status == status)
+        conditions.append(IllegalDumpReport.status == status)
+    return conditions
+
+async def get_user_reports(db: AsyncSession, user_id: int, status: str = None, limit: int = 20, cursor: str = None):
+    """A page of the user's reports, newest first, continuing after ``cursor`` if given"""
+    query = (
+        select(IllegalDumpReport)
+        .where(*_user_reports_filter(user_id, status))
+        .order_by(IllegalDumpReport.created_at.desc(), IllegalDumpReport.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(IllegalDumpReport.created_at, IllegalDumpReport.id) < tuple_(cursor_created_at, cursor_id)
+        )
     result = await db.execute(query)
     return result.scalars().all()
 
+async def count_user_reports(db: AsyncSession, user_id: int, status: str = None) -> int:
+    query = select(func.count()).select_from(IllegalDumpReport).where(*_user_reports_filter(user_id, status))
+    result = await db.execute(query)
+    return result.scalar_one()
+
 async def get_report_by_id(db: AsyncSession, report_id: int, user_id: int = None):
     query = select(IllegalDumpReport).where(IllegalDumpReport.id == report_id)
     if user_id:
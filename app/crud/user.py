@@ -1,23 +1,56 @@
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
 
-from app.core.security import get_password_hash
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.geo import geohash_for
+from app.core.security import hash_password_async
 from app.models.user import User
 from app.models.collector import CollectorProfile
 from app.schemas.auth import UserCreate, CollectorProfileCreate
 
+# UserWithProfile snapshots keyed by token subject (email), filled by get_current_user
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(email: Optional[str] = None, user_id: Optional[int] = None):
+    """Drop a cached user after the user or their collector profile changes"""
+    if email is not None:
+        user_cache.pop(email)
+    if user_id is not None:
+        user_cache.pop_where(lambda cached: cached.id == user_id)
+
 async def get_user_by_email(db: AsyncSession, email: str):
     stmt = (
         select(User)
         .options(selectinload(User.collector_profile))
-        .where(User.email == email)
+        .where(func.lower(User.email) == email.strip().lower())
     )
     result = await db.execute(stmt)
     return result.scalar_one_or_none()
 
+async def insert_user_if_absent(db: AsyncSession, user_data: dict):
+    """Insert a user unless the email is taken, in a single round trip.
+
+    Duplicates are detected by ON CONFLICT against the lower(email) unique
+    index. Returns the new user's row, or None if the email already exists.
+    """
+    stmt = (
+        insert(User)
+        .values(**user_data)
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.id, User.full_name, User.email, User.role, User.created_at)
+    )
+    result = await db.execute(stmt)
+    row = result.mappings().one_or_none()
+    await db.commit()
+    return row
+
 async def create_user(db: AsyncSession, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password_async(user.password)
     db_user = User(
         full_name=user.full_name,
         email=user.email,
@@ -27,6 +60,7 @@ async def create_user(db: AsyncSession, user: UserCreate):
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    invalidate_cached_user(email=db_user.email)
     return db_user
 
 async def create_collector_profile(db: AsyncSession, profile: CollectorProfileCreate, user_id: int):
@@ -40,4 +74,55 @@ async def create_collector_profile(db: AsyncSession, profile: CollectorProfileCr
     db.add(db_profile)
     await db.commit()
     await db.refresh(db_profile)
-    return db_profile
\ No newline at end of file
+    invalidate_cached_user(user_id=user_id)
+    return db_profile
+
+async def create_collector_with_profile(db: AsyncSession, user_data: dict, profile: CollectorProfileCreate):
+    """Insert a collector user and their profile in one statement and one transaction.
+
+    Both INSERTs run as data-modifying CTEs and hand back their rows through
+    RETURNING, so no follow-up SELECT is needed. Profile columns come back
+    prefixed with ``profile_``. A duplicate email hits ON CONFLICT on the
+    lower(email) index: the user INSERT skips the row, the profile INSERT has
+    nothing to select from, and None is returned.
+    """
+    new_user = (
+        insert(User)
+        .values(**user_data, is_active=True)
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.id, User.full_name, User.email, User.role, User.created_at)
+        .cte("new_user")
+    )
+    
+    profile_columns = CollectorProfile.__table__.c
+    profile_values = {
+        "location": profile.location,
+        "price_min": profile.price_min,
+        "price_max": profile.price_max,
+        "working_days": profile.working_days,
+        "waste_types": profile.waste_types,
+        "quantity_accepted": profile.quantity_accepted,
+        "whatsapp_number": profile.whatsapp_number,
+        "average_rating": 0.0,
+        "status": profile.status,
+        "latitude": profile.latitude,
+        "longitude": profile.longitude,
+        "geohash": geohash_for(profile.latitude, profile.longitude),
+    }
+    new_profile = (
+        insert(CollectorProfile)
+        .from_select(
+            ["user_id", *profile_values],
+            select(
+                new_user.c.id,
+                *[literal(value, profile_columns[name].type) for name, value in profile_values.items()]
+            )
+        )
+        .returning(*[column.label(f"profile_{column.name}") for column in profile_columns])
+        .cte("new_profile")
+    )
+    
+    result = await db.execute(select(new_user, new_profile))
+    row = result.mappings().one_or_none()
+    await db.commit()
+    return row
\ No newline at end of file
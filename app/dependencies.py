@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import verify_password
-from app.crud.user import get_user_by_email
+from app.crud.user import get_user_by_email, user_cache
 from app.schemas.auth import TokenData
 from app.core.database import get_db
 from app.models.user import User  # Add this import
@@ -34,11 +34,19 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    cached_user = user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
+    
     user = await get_user_by_email(db, email=token_data.email)  # Add await here
     if user is None:
         raise credentials_exception
-        
-    return UserWithProfile.from_orm(user)
+    
+    current_user = UserWithProfile.model_validate(user)
+    user_cache.set(token_data.email, current_user)
+    # Hand the connection back before the handler does any slow work
+    await db.release()
+    return current_user
 
 async def get_current_resident(
     current_user: UserWithProfile = Depends(get_current_user)
@@ -1,13 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.config import settings
 from app.core.database import engine
+from app.core.events import listing_events
+from app.core.heartbeats import heartbeats
+from app.core.images import image_variants
+from app.core.jobs import job_runner
+from app.core.matching import collector_index
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import password_hasher
+from app.core.static import UploadStaticFiles
+from app.core.upload_sessions import UPLOAD_LENGTH_HEADER, UPLOAD_OFFSET_HEADER, upload_sessions
 from app.models.user import Base
-from app.routers import auth, report, collector, marketplace
+from app.crud.collector import load_collector_match_rows
+from app.routers import auth, report, collector, marketplace, metrics
 
 app = FastAPI()
 
+# Reject oversized bodies before multipart parsing; upload routes get a larger allowance
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    default_limit=settings.MAX_REQUEST_BODY_BYTES,
+    route_limits={
+        ("POST", "/reports/dumping"): settings.MAX_UPLOAD_BODY_BYTES,
+        ("POST", "/marketplace/listings/"): settings.MAX_UPLOAD_BODY_BYTES,
+    },
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -15,22 +37,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, UPLOAD_OFFSET_HEADER, UPLOAD_LENGTH_HEADER, "Location", "ETag"],
 )
 
 # Mount static files for uploaded images
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory="uploads"), name="uploads")
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(report.router)
 app.include_router(collector.router)
 app.include_router(marketplace.router)
+app.include_router(metrics.router)
 
 # Create tables on startup
 @app.on_event("startup")
 async def on_startup():
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+    upload_sessions.start_cleanup(settings.UPLOAD_SESSION_CLEANUP_INTERVAL_SECONDS)
+    job_runner.start()
+    collector_index.start_refresh(load_collector_match_rows, settings.MATCH_INDEX_REFRESH_SECONDS)
+    heartbeats.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    upload_sessions.stop_cleanup()
+    await job_runner.stop()
+    collector_index.stop_refresh()
+    await heartbeats.stop()
+    listing_events.close()
+    password_hasher.shutdown()
+    image_variants.shutdown()
 
 @app.get("/")
 def read_root():
@@ -1,8 +1,9 @@
 from enum import Enum
 from uuid import UUID
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, ARRAY
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Index, ARRAY, DateTime
 from sqlalchemy.dialects.postgresql import ENUM, ARRAY
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.core.database import Base
 
 class WasteTypeEnum(str, Enum):
@@ -36,5 +37,17 @@ class CollectorProfile(Base):
     whatsapp_number = Column(String, nullable=True)
     average_rating = Column(Float, default=0.0)
     status = Column(ENUM(CollectorStatusEnum), nullable=False, default=CollectorStatusEnum.OFFLINE, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12, collation="C"), nullable=True, index=True)  # see app.core.geo
+    # Version for conditional GETs (app.core.http_cache); bumped by every UPDATE
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Last heartbeat, within HEARTBEAT_TIMEOUT_SECONDS / 3; see app.core.heartbeats
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
     
-    user = relationship("User", back_populates="collector_profile")
\ No newline at end of file
+    user = relationship("User", back_populates="collector_profile")
+
+    __table_args__ = (
+        # Trigram index for substring (ILIKE) and fuzzy location search; needs pg_trgm
+        Index("ix_collector_profiles_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+    )
\ No newline at end of file
@@ -0,0 +1,33 @@
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Text, Enum as SQLEnum, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class JobStatusEnum(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+class Job(Base):
+    """Background work queued by a request and executed by app.core.jobs"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSONB, nullable=False, server_default="{}")
+    status = Column(SQLEnum(JobStatusEnum), nullable=False, default=JobStatusEnum.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claim query: due jobs in run_after order
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
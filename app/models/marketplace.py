@@ -1,6 +1,6 @@
 from enum import Enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -23,6 +23,9 @@ class Listing(Base):
     price = Column(Float, nullable=False)
     quantity = Column(SQLEnum("SMALL", "MEDIUM", "LARGE", name="quantityenum"), nullable=False)
     location = Column(String, nullable=False, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12, collation="C"), nullable=True, index=True)  # see app.core.geo
     image_url = Column(String, nullable=False)
     status = Column(SQLEnum(ListingStatusEnum), nullable=False, default=ListingStatusEnum.AVAILABLE, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -32,4 +35,11 @@ class Listing(Base):
     
     # Relationships
     resident = relationship("User", foreign_keys=[resident_id], backref="listings_as_resident")
-    collector = relationship("User", foreign_keys=[collector_id], backref="listings_as_collector") 
\ No newline at end of file
+    collector = relationship("User", foreign_keys=[collector_id], backref="listings_as_collector")
+
+    __table_args__ = (
+        # Keyset pagination over (created_at, id), newest first
+        Index("ix_marketplace_listings_created_at_id", "created_at", "id"),
+        # Trigram index for substring (ILIKE) and fuzzy location search; needs pg_trgm
+        Index("ix_marketplace_listings_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+    ) 
\ No newline at end of file
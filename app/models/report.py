@@ -1,6 +1,6 @@
 from enum import Enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Enum as SQLEnum, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
@@ -29,8 +29,18 @@ class IllegalDumpReport(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     image_url = Column(String, nullable=False)
     location = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12, collation="C"), nullable=True, index=True)  # see app.core.geo
     description = Column(String, nullable=True)
     waste_type = Column(SQLEnum(WasteTypeEnum), nullable=False)
     severity = Column(SQLEnum(SeverityLevelEnum), nullable=False)
     status = Column(SQLEnum(ReportStatusEnum), default=ReportStatusEnum.PENDING, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        # "My reports": filter by owner (and status), newest first
+        Index("ix_illegal_dump_reports_user_status_created", "user_id", "status", "created_at"),
+        # Unfiltered "my reports": keyset order (created_at, id) straight off the index
+        Index("ix_illegal_dump_reports_user_created_id", "user_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from enum import Enum
-from sqlalchemy import ARRAY, Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import ARRAY, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -30,6 +30,11 @@ class User(Base):
     collector_profile_legacy = relationship("CollectorProfileLegacy", backref="user", uselist=False)
     collector_profile = relationship("CollectorProfile", back_populates="user", uselist=False)
 
+    # Case-insensitive uniqueness; lookups filter on lower(email) so they can use it
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
 class CollectorProfileLegacy(Base):
     __tablename__ = "collector_profiles_legacy"
 
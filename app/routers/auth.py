@@ -4,19 +4,20 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash
-from app.crud.user import create_collector_profile, create_user, get_user_by_email
+from app.core.matching import collector_index
+from app.core.security import create_access_token, hash_password_async, verify_and_update_password
+from app.crud.user import (
+    create_collector_profile, create_collector_with_profile, create_user, get_user_by_email,
+    insert_user_if_absent, invalidate_cached_user
+)
 from app.dependencies import get_current_user
 from app.schemas.auth import Token, UserCreate, CollectorProfileCreate, UserLogin
 from app.schemas.user import UserOut, UserWithProfile
-from app.models.user import User
-from app.models.collector import CollectorProfile, WasteTypeEnum, QuantityEnum
+from app.models.collector import WasteTypeEnum, QuantityEnum
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -51,7 +52,7 @@ async def login_for_access_token(
             )
         
         # Log password verification attempt (without exposing the actual password)
-        password_valid = verify_password(form_data.password, user.password_hash)
+        password_valid, new_hash = await verify_and_update_password(form_data.password, user.password_hash)
         logger.info(f"Password verification result: {'Valid' if password_valid else 'Invalid'}")
         
         if not password_valid:
@@ -62,6 +63,16 @@ async def login_for_access_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Stored hash uses an outdated bcrypt cost; upgrade it now that we know the password
+        if new_hash:
+            try:
+                user.password_hash = new_hash
+                await db.commit()
+                logger.info(f"Rehashed password for user: {email}")
+            except SQLAlchemyError as e:
+                await db.rollback()
+                logger.error(f"Failed to store rehashed password for {email}: {str(e)}")
+        
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": user.email}, expires_delta=access_token_expires
@@ -92,33 +103,27 @@ async def register_user(
         # Normalize email (trim whitespace and convert to lowercase)
         normalized_email = user.email.strip().lower()
         
-        # Check if email exists using a direct query for better control
-        stmt = select(User).where(User.email.ilike(normalized_email))
-        result = await db.execute(stmt)
-        existing_user = result.scalar_one_or_none()
-        
-        if existing_user:
-            logger.warning(f"Registration attempt with existing email: {normalized_email}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail={
-                    "message": "Email already registered",
-                    "code": "EMAIL_EXISTS",
-                    "email": normalized_email
-                }
-            )
-        
         # Create new user with normalized email
         # Remove password from user_data and use password_hash instead
         user_data = user.dict(exclude={'password', 'confirm_password'})
         user_data["email"] = normalized_email
-        user_data["password_hash"] = get_password_hash(user.password)
+        user_data["password_hash"] = await hash_password_async(user.password)
         
         try:
-            new_user = User(**user_data)
-            db.add(new_user)
-            await db.commit()
-            await db.refresh(new_user)
+            # Duplicate emails are detected by ON CONFLICT on lower(email)
+            new_user = await insert_user_if_absent(db, user_data)
+            
+            if new_user is None:
+                logger.warning(f"Registration attempt with existing email: {normalized_email}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "message": "Email already registered",
+                        "code": "EMAIL_EXISTS",
+                        "email": normalized_email
+                    }
+                )
+            invalidate_cached_user(email=normalized_email)
             
             # Log successful registration
             logger.info(f"Successfully registered new user: {normalized_email}")
@@ -126,8 +131,7 @@ async def register_user(
             # Add background task for any post-registration processing if needed
             background_tasks.add_task(log_registration_event, normalized_email)
             
-            # Fix: Use model_validate instead of from_orm for Pydantic v2
-            return UserOut.model_validate(new_user)
+            return UserOut.model_validate(dict(new_user))
             
         except SQLAlchemyError as e:
             await db.rollback()
@@ -169,97 +173,15 @@ async def register_collector(
         normalized_email = user.email.strip().lower()
         logger.info(f"Normalized email: {normalized_email}")
         
-        # Check if email exists using a direct query for better control
-        stmt = select(User).where(User.email.ilike(normalized_email))
-        result = await db.execute(stmt)
-        existing_user = result.scalar_one_or_none()
-        
-        if existing_user:
-            logger.warning(f"Collector registration attempt with existing email: {normalized_email}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail={
-                    "message": "Email already registered",
-                    "code": "EMAIL_EXISTS",
-                    "email": normalized_email
-                }
-            )
-        
         # Create new user with normalized email
         user_data = user.dict(exclude={'password', 'confirm_password'})
         user_data["email"] = normalized_email
-        user_data["password_hash"] = get_password_hash(user.password)
+        user_data["password_hash"] = await hash_password_async(user.password)
         
         try:
-            logger.info("Creating new user...")
-            # Create user
-            new_user = User(**user_data)
-            db.add(new_user)
-            await db.commit()
-            await db.refresh(new_user)
-            logger.info(f"User created successfully with ID: {new_user.id}")
-            
-            logger.info("Creating collector profile...")
-            # Create collector profile
-            db_profile = CollectorProfile(
-                user_id=new_user.id,
-                location=profile.location,
-                price_min=profile.price_min,
-                price_max=profile.price_max,
-                working_days=profile.working_days,
-                waste_types=profile.waste_types,
-                quantity_accepted=profile.quantity_accepted,
-                whatsapp_number=profile.whatsapp_number
-            )
-            db.add(db_profile)
-            await db.commit()
-            await db.refresh(db_profile)
-            logger.info(f"Collector profile created successfully for user ID: {new_user.id}")
-            
-            # FIXED: Explicitly load the user with the collector profile relationship
-            # This prevents the greenlet error by eager loading the relationship
-            stmt = select(User).options(selectinload(User.collector_profile)).where(User.id == new_user.id)
-            result = await db.execute(stmt)
-            new_user_with_profile = result.scalar_one()
-            logger.info("User loaded with collector profile")
-            
-            # Convert to response model
-            try:
-                # Use model_validate for Pydantic v2 compatibility
-                response = UserWithProfile.model_validate(new_user_with_profile)
-                logger.info("Successfully converted user to response model")
-                return response
-            except Exception as e:
-                logger.error(f"Error converting user to response model: {str(e)}")
-                # Fallback to manual construction if model_validate fails
-                logger.info("Attempting manual response construction as fallback")
-                
-                response_data = {
-                    "id": new_user.id,
-                    "email": new_user.email,
-                    "username": new_user.username,
-                    "role": new_user.role,
-                    "is_active": new_user.is_active,
-                    "created_at": new_user.created_at,
-                    "updated_at": new_user.updated_at,
-                    "collector_profile": {
-                        "id": db_profile.id,
-                        "location": db_profile.location,
-                        "price_min": db_profile.price_min,
-                        "price_max": db_profile.price_max,
-                        "working_days": db_profile.working_days,
-                        "waste_types": db_profile.waste_types,
-                        "quantity_accepted": db_profile.quantity_accepted,
-                        "whatsapp_number": db_profile.whatsapp_number,
-                        "created_at": db_profile.created_at,
-                        "updated_at": db_profile.updated_at
-                    }
-                }
-                
-                response = UserWithProfile(**response_data)
-                logger.info("Successfully created response using manual construction")
-                return response
-            
+            # User and profile are written together; duplicates are detected by
+            # ON CONFLICT on lower(email) instead of a pre-check query
+            row = await create_collector_with_profile(db, user_data, profile)
         except SQLAlchemyError as e:
             await db.rollback()
             logger.error(f"Database error during collector registration: {str(e)}")
@@ -267,6 +189,37 @@ async def register_collector(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database error: {str(e)}"
             )
+        
+        if row is None:
+            logger.warning(f"Collector registration attempt with existing email: {normalized_email}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": "Email already registered",
+                    "code": "EMAIL_EXISTS",
+                    "email": normalized_email
+                }
+            )
+        
+        invalidate_cached_user(email=normalized_email)
+        logger.info(f"Collector registered with user ID: {row['id']}, profile ID: {row['profile_id']}")
+        
+        collector_profile = {
+            name[len("profile_"):]: value
+            for name, value in row.items()
+            if name.startswith("profile_")
+        }
+        collector_index.upsert(collector_profile)
+        
+        # Build the response from the RETURNING row, no reload needed
+        return UserWithProfile(
+            id=row["id"],
+            full_name=row["full_name"],
+            email=row["email"],
+            role=row["role"],
+            created_at=row["created_at"],
+            collector_profile=collector_profile
+        )
             
     except HTTPException:
         raise
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+import json
 import logging
 
 from app.core.database import get_async_db
+from app.core.heartbeats import heartbeats
+from app.core.http_cache import cache_headers, not_modified, rows_etag
+from app.dependencies import get_current_collector
+from app.schemas.user import UserWithProfile
+from app.core.serialization import ListSerializer
 from app.schemas.collector import *
 from app.crud.collector import *
 
@@ -12,12 +19,20 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/collectors", tags=["collectors"])
 
+collector_list_serializer = ListSerializer(SimpleCollectorResponse, skip_invalid=True)
+
+def live_status(collector):
+    """Status from a heartbeat this process holds, else the stored one (up to a flush interval old)"""
+    return heartbeats.status_of(collector.id) or collector.status
+
 @router.get("/", response_model=List[SimpleCollectorResponse])
 async def get_all_collectors(
+    request: Request,
     location: Optional[str] = Query(None, description="Filter by location"),
     waste_type: Optional[str] = Query(None, description="Filter by waste type"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    fuzzy: bool = Query(False, description="Typo-tolerant location match, best match first"),
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get all collectors - simplified endpoint with no relations"""
@@ -31,42 +46,26 @@ async def get_all_collectors(
             location=location,
             waste_type=waste_type,
             limit=limit,
-            offset=offset
+            offset=offset,
+            fuzzy=fuzzy
         )
         
         logger.info(f"Retrieved {len(collectors)} collectors from database")
         
-        if not collectors:
-            logger.info("No collectors found")
-            return []
-        
-        # Convert to response models
-        collector_responses = []
-        for collector in collectors:
-            try:
-                response = SimpleCollectorResponse(
-                    id=collector.id,
-                    user_id=collector.user_id,
-                    location=collector.location,
-                    price_min=collector.price_min,
-                    price_max=collector.price_max,
-                    working_days=collector.working_days,
-                    waste_types=collector.waste_types,
-                    quantity_accepted=getattr(collector, 'quantity_accepted', []),
-                    whatsapp_number=getattr(collector, 'whatsapp_number', None),
-                    average_rating=getattr(collector, 'average_rating', 0.0)
-                )
-                
-                collector_responses.append(response)
-                logger.debug(f"Processed collector {collector.id}")
-                
-            except Exception as e:
-                logger.error(f"Error processing collector {collector.id}: {str(e)}")
-                # Continue with other collectors instead of failing entirely
-                continue
+        # Answer revalidations from the page's versions without serializing it;
+        # live statuses are part of the tag since they change ahead of updated_at
+        statuses = {collector.id: live_status(collector) for collector in collectors}
+        etag = rows_etag(collectors, *statuses.values())
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
         
-        logger.info(f"Successfully processed {len(collector_responses)} collectors")
-        return collector_responses
+        # Validate the whole page once and encode it directly; rows that fail
+        # validation are skipped instead of failing the request
+        items = collector_list_serializer.validate(collectors)
+        for item in items:
+            item.status = CollectorStatusEnum(statuses[item.id]).value
+        return collector_list_serializer.response(items, headers=cache_headers(etag))
         
     except Exception as e:
         logger.error(f"Error in get_all_collectors: {str(e)}", exc_info=True)
@@ -75,6 +74,44 @@ async def get_all_collectors(
             detail="Failed to fetch collectors"
         )
 
+@router.get("/nearby", response_model=List[NearbyCollectorResponse])
+async def get_nearby_collectors_endpoint(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=100, description="Search radius in kilometres"),
+    waste_type: Optional[WasteTypeEnum] = Query(None, description="Only collectors accepting this waste type"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of collectors (k)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Nearest available collectors to a point, closest first"""
+    try:
+        nearby = await get_nearby_collectors(
+            db=db,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+            waste_type=waste_type.value if waste_type else None,
+            limit=limit,
+            status_overrides=heartbeats.pending_statuses()
+        )
+        return [
+            NearbyCollectorResponse(
+                **SimpleCollectorResponse.model_validate(collector).model_dump(exclude={"status"}),
+                status=live_status(collector),
+                distance_km=round(distance, 3)
+            )
+            for collector, distance in nearby
+            # A heartbeat may have changed the status while the query ran
+            if live_status(collector) == CollectorStatusEnum.AVAILABLE
+        ]
+        
+    except Exception as e:
+        logger.error(f"Error in get_nearby_collectors: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to fetch nearby collectors"
+        )
+
 @router.get("/raw", response_model=List[dict])
 async def get_collectors_raw(
     limit: int = Query(100, ge=1, le=1000),
@@ -85,11 +122,11 @@ async def get_collectors_raw(
     try:
         logger.info("Fetching collectors as raw data")
         
-        collectors = await get_all_collectors_simple(db)
+        collectors = await get_all_collectors_simple(db, limit=limit, offset=offset)
         
         # Convert to simple dictionaries
         raw_collectors = []
-        for collector in collectors[offset:offset+limit]:
+        for collector in collectors:
             try:
                 raw_data = {
                     "id": str(collector.id) if collector.id else None,
@@ -115,21 +152,67 @@ async def get_collectors_raw(
     except Exception as e:
         logger.error(f"Error in get_collectors_raw: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_collectors():
+    """Export every collector as newline-delimited JSON, streamed from a server-side cursor"""
+    
+    async def ndjson_lines():
+        count = 0
+        async for row in stream_all_collectors():
+            yield json.dumps(dict(row._mapping), default=str) + "\n"
+            count += 1
+        logger.info(f"Exported {count} collectors")
+    
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="collectors.ndjson"'}
+    )
  
+@router.post("/me/heartbeat", response_model=CollectorHeartbeatResponse)
+async def collector_heartbeat(
+    heartbeat: CollectorHeartbeat,
+    current_user: UserWithProfile = Depends(get_current_collector)
+):
+    """Report the collector's current status; send again before it expires.
+
+    Buffered in memory and written to the database in batches, so this
+    endpoint never touches the database itself.
+    """
+    if current_user.collector_profile is None:
+        raise HTTPException(status_code=404, detail="Collector profile not found")
+    
+    heartbeats.record(current_user.collector_profile.id, heartbeat.status)
+    return CollectorHeartbeatResponse(status=heartbeat.status, expires_in_seconds=heartbeats.timeout)
+
 @router.get("/{collector_id}", response_model=SimpleCollectorResponse)
 async def get_collector_by_id(
     collector_id: Union[UUID, int],
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get single collector by ID - simplified"""
     try:
         logger.info(f"Fetching collector by ID: {collector_id}")
         
+        if request.headers.get("if-none-match"):
+            # Revalidation only needs the version, not the whole profile
+            version = await get_collector_version(db, collector_id)
+            if not version:
+                raise HTTPException(status_code=404, detail="Collector not found")
+            unchanged = not_modified(request, rows_etag([version], live_status(version)))
+            if unchanged:
+                return unchanged
+        
         collector = await get_collector_by_id_simple(db, collector_id)
         if not collector:
             raise HTTPException(status_code=404, detail="Collector not found")
         
-        response = SimpleCollectorResponse(
+        collector_status = live_status(collector)
+        response.headers.update(cache_headers(rows_etag([collector], collector_status)))
+        return SimpleCollectorResponse(
             id=collector.id,
             user_id=collector.user_id,
             location=collector.location,
@@ -139,11 +222,10 @@ async def get_collector_by_id(
             waste_types=collector.waste_types,
             quantity_accepted=getattr(collector, 'quantity_accepted', []),
             whatsapp_number=getattr(collector, 'whatsapp_number', None),
-            average_rating=getattr(collector, 'average_rating', 0.0)
+            average_rating=getattr(collector, 'average_rating', 0.0),
+            status=collector_status
         )
-        
-        return response
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -1,21 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query, File, UploadFile
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from app.core.database import get_async_db
+from app.core.events import listing_events
+from app.core.file_handling import save_image_blob
+from app.core.http_cache import cache_headers, not_modified, rows_etag
+from app.core.job_handlers import IMAGE_VARIANTS_JOB
+from app.core.heartbeats import heartbeats
+from app.core.jobs import enqueue
+from app.core.matching import collector_index
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.core.serialization import ListSerializer
 from app.schemas.marketplace import (
     ListingCreate, ListingResponse, ListingSummary, ListingSearchParams, ListingUpdate
 )
+from app.crud.collector import get_collectors_by_ids, load_collector_match_rows
 from app.crud.marketplace import (
-    create_listing, get_listing, get_listings, update_listing_status
+    ListingStatusConflict, create_listing, get_listing, get_listing_match_criteria, get_listing_summaries,
+    get_listing_version, update_listing_status
 )
 from app.models.marketplace import ListingStatusEnum
 from app.models.collector import WasteTypeEnum, QuantityEnum
 from app.dependencies import get_current_user, get_current_collector, get_current_resident
+from app.schemas.collector import CollectorMatch, SimpleCollectorResponse
 from app.schemas.user import UserOut
 
 router = APIRouter(prefix="/marketplace/listings", tags=["marketplace"])
 
+listing_summary_serializer = ListSerializer(ListingSummary)
+
 # Ensure uploads directory exists (e.g. in the project root)
 os.makedirs("uploads", exist_ok=True)
 
@@ -27,6 +42,8 @@ async def create_marketplace_listing(
     price: float = Query(..., gt=0),
     quantity: str = Query(...),
     location: str = Query(...),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
     image: UploadFile = File(...),
     db: AsyncSession = Depends(get_async_db),
     current_user: UserOut = Depends(get_current_resident)
@@ -47,11 +64,9 @@ async def create_marketplace_listing(
         )
     
     # Save the uploaded image
-    image_filename = f"{current_user.id}_{image.filename}"
-    image_path = os.path.join("uploads", image_filename)
-    with open(image_path, "wb") as f:
-         f.write(await image.read())
-    image_url = f"/uploads/{image_filename}"
+    _, image_url = await save_image_blob(image)
+    # Committed together with the listing by create_listing
+    enqueue(db, IMAGE_VARIANTS_JOB, {"image_url": image_url})
 
     # Create a ListingCreate instance
     listing_in = ListingCreate(
@@ -61,53 +76,58 @@ async def create_marketplace_listing(
         price=price,
         quantity=quantity_enum,  # Pass the enum directly, not its value
         location=location,
+        latitude=latitude,
+        longitude=longitude,
         image_url=image_url
     )
     
     db_listing = await create_listing(db, listing_in, resident_id=current_user.id)
-    return ListingResponse(
+    response = ListingResponse(
         **db_listing.__dict__,
         resident_name=current_user.full_name,
         collector_name=None
     )
+    listing_events.publish("listing.created", response.model_dump_json(), response.waste_type, response.location)
+    return response
+
+def next_cursor_headers(listings: list, limit: int) -> dict:
+    """Header carrying the keyset cursor for the next page, if there may be one"""
+    if len(listings) < limit:
+        return {}
+    last = listings[-1]
+    return {NEXT_CURSOR_HEADER: encode_cursor(last.created_at, last.id)}
+
+def listing_page_response(request: Request, listings: list, headers: dict) -> Response:
+    """Serialized page of summaries, or a 304 if the client's ETag still matches"""
+    etag = rows_etag(listings)
+    return not_modified(request, etag, headers) or listing_summary_serializer.response(
+        listings, headers=cache_headers(etag, headers)
+    )
 
 @router.get("/", response_model=List[ListingSummary])
 async def get_all_listings(
+    request: Request,
     db: AsyncSession = Depends(get_async_db),
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; overrides offset")
 ):
-    params = ListingSearchParams(limit=limit, offset=offset, status=ListingStatusEnum.AVAILABLE)
-    listings = await get_listings(db, params)
-    return [
-        ListingSummary(
-            **listing.__dict__,
-            resident_name=listing.resident.full_name
-        ) for listing in listings
-    ]
-
-@router.get("/{listing_id}", response_model=ListingResponse)
-async def get_listing_by_id(
-    listing_id: int,
-    db: AsyncSession = Depends(get_async_db)
-):
-    listing = await get_listing(db, listing_id)
-    if not listing:
-        raise HTTPException(status_code=404, detail="Listing not found")
-    return ListingResponse(
-        **listing.__dict__,
-        resident_name=listing.resident.full_name,
-        collector_name=listing.collector.full_name if listing.collector else None
-    )
+    params = ListingSearchParams(limit=limit, offset=offset, cursor=cursor, status=ListingStatusEnum.AVAILABLE)
+    listings = await get_listing_summaries(db, params)
+    return listing_page_response(request, listings, next_cursor_headers(listings, limit))
 
+# Declared before /{listing_id} so "search" is not captured as a listing id
 @router.get("/search", response_model=List[ListingSummary])
 async def search_listings(
+    request: Request,
     waste_type: Optional[WasteTypeEnum] = Query(None),
     location: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None),
     max_price: Optional[float] = Query(None),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header; overrides offset"),
+    fuzzy: bool = Query(False, description="Typo-tolerant location match, best match first; pages by offset"),
     db: AsyncSession = Depends(get_async_db)
 ):
     params = ListingSearchParams(
@@ -117,14 +137,83 @@ async def search_listings(
         max_price=max_price,
         status=ListingStatusEnum.AVAILABLE,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        fuzzy=fuzzy
     )
-    listings = await get_listings(db, params)
+    listings = await get_listing_summaries(db, params)
+    headers = {} if fuzzy and location else next_cursor_headers(listings, limit)
+    return listing_page_response(request, listings, headers)
+
+# Declared before /{listing_id} so "stream" is not captured as a listing id
+@router.get("/stream")
+async def stream_listing_events(
+    waste_type: Optional[WasteTypeEnum] = Query(None),
+    location: Optional[str] = Query(None, description="Case-insensitive substring of the listing location"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Server-sent events for listings created or changing status, as ListingResponse JSON.
+
+    Events are ``listing.created`` and ``listing.status_changed``. A ``reset``
+    event means the client fell too far behind and should reload listings.
+    """
+    return StreamingResponse(
+        listing_events.stream(waste_type, location, last_event_id),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{listing_id}", response_model=ListingResponse)
+async def get_listing_by_id(
+    listing_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if request.headers.get("if-none-match"):
+        # Revalidation only needs the version, not the listing and its users
+        version = await get_listing_version(db, listing_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Listing not found")
+        unchanged = not_modified(request, rows_etag([version]))
+        if unchanged:
+            return unchanged
+    
+    listing = await get_listing(db, listing_id)
+    if not listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    response.headers.update(cache_headers(rows_etag([listing])))
+    return ListingResponse(
+        **listing.__dict__,
+        resident_name=listing.resident.full_name,
+        collector_name=listing.collector.full_name if listing.collector else None
+    )
+
+@router.get("/{listing_id}/matches", response_model=List[CollectorMatch])
+async def get_listing_matches(
+    listing_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    day: Optional[str] = Query(None, description="Only collectors working on this day, e.g. Monday"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AVAILABLE collectors that take this listing's waste type, quantity and price, best rated first"""
+    listing = await get_listing_match_criteria(db, listing_id)
+    if not listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    
+    await collector_index.ensure_loaded(load_collector_match_rows)
+    collector_ids = collector_index.match(
+        listing.waste_type, quantity=listing.quantity, price=listing.price, day=day, limit=limit
+    )
+    collectors = await get_collectors_by_ids(db, collector_ids)
     return [
-        ListingSummary(
-            **listing.__dict__,
-            resident_name=listing.resident.full_name
-        ) for listing in listings
+        CollectorMatch(
+            **SimpleCollectorResponse.model_validate(collector).model_dump(exclude={"status"}),
+            status=heartbeats.status_of(collector.id) or collector.status,
+            rank=rank
+        )
+        for rank, collector in enumerate(collectors, start=1)
     ]
 
 @router.patch("/{listing_id}/status", response_model=ListingResponse)
@@ -134,11 +223,19 @@ async def update_listing_status_endpoint(
     db: AsyncSession = Depends(get_async_db),
     current_user: UserOut = Depends(get_current_collector)
 ):
-    listing = await update_listing_status(db, listing_id, new_status, collector_id=current_user.id)
+    try:
+        listing = await update_listing_status(db, listing_id, new_status, collector_id=current_user.id)
+    except ListingStatusConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Listing status changed, cannot apply this transition",
+                "code": "STATUS_CONFLICT",
+                "current_status": e.current_status.value
+            }
+        )
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    return ListingResponse(
-        **listing.__dict__,
-        resident_name=listing.resident.full_name,
-        collector_name=listing.collector.full_name if listing.collector else None
-    ) 
\ No newline at end of file
+    response = ListingResponse(**listing)
+    listing_events.publish("listing.status_changed", response.model_dump_json(), response.waste_type, response.location)
+    return response
\ No newline at end of file
@@ -0,0 +1,57 @@
+from fastapi import APIRouter
+
+from app.core.database import get_connection_hold_stats, get_pool_stats
+from app.core.events import listing_events
+from app.core.heartbeats import heartbeats
+from app.core.images import image_variants
+from app.core.jobs import job_runner
+from app.core.matching import collector_index
+from app.core.security import password_hasher
+from app.crud.user import user_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/password-hashing")
+async def get_password_hashing_metrics():
+    """Queue depth and latency of the bcrypt worker pool"""
+    return password_hasher.stats()
+
+@router.get("/user-cache")
+async def get_user_cache_metrics():
+    """Hit/miss counters of the authenticated-user cache"""
+    return user_cache.stats()
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    """Connection pool usage and checkout wait times"""
+    return get_pool_stats()
+
+@router.get("/db-connections")
+async def get_db_connection_metrics():
+    """Per-route connection hold times, longest total first"""
+    return get_connection_hold_stats()
+
+@router.get("/image-variants")
+async def get_image_variant_metrics():
+    """Progress of background image variant generation"""
+    return image_variants.stats()
+
+@router.get("/jobs")
+async def get_job_metrics():
+    """Background job throughput, queue latency and outcomes"""
+    return job_runner.stats()
+
+@router.get("/match-index")
+async def get_match_index_metrics():
+    """Size, rebuild time and query latency of the collector match index"""
+    return collector_index.stats()
+
+@router.get("/heartbeats")
+async def get_heartbeat_metrics():
+    """Buffered collector status heartbeats and flush activity"""
+    return heartbeats.stats()
+
+@router.get("/listing-events")
+async def get_listing_event_metrics():
+    """Open listing event streams and fan-out counts"""
+    return listing_events.stats()
\ No newline at end of file
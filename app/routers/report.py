@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Header, Request, Response
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -7,15 +7,25 @@ import logging
 from app.core.database import get_db
 from app.dependencies import get_current_user
 from app.models.report import IllegalDumpReport
-from app.schemas.report import ReportCreate, ReportOut, ReportList, ReportStatusUpdate
+from app.schemas.report import (
+    ReportCreate, ReportOut, ReportList, ReportStatusUpdate, UploadSessionCreate, UploadSessionOut
+)
 from app.schemas.user import UserOut
 from app.crud.report import (
     create_report,
     get_user_reports,
+    count_user_reports,
     get_report_by_id,
     update_report_status
 )
-from app.core.file_handling import save_uploaded_file
+from app.core.file_handling import IMAGE_EXTENSIONS, MAX_FILE_SIZE, save_file_as_blob, save_image_blob
+from app.core.job_handlers import IMAGE_VARIANTS_JOB
+from app.core.jobs import enqueue
+from app.core.pagination import encode_cursor
+from app.core.serialization import ResponseSerializer
+from app.core.upload_sessions import (
+    CHUNK_CONTENT_TYPE, UPLOAD_LENGTH_HEADER, UPLOAD_OFFSET_HEADER, upload_sessions
+)
 from app.models.user import User
 
 # Set up logging
@@ -23,6 +33,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+report_list_serializer = ResponseSerializer(ReportList)
+
 @router.post("/dumping", response_model=ReportOut, status_code=status.HTTP_201_CREATED)
 async def create_dumping_report(
     image: UploadFile = File(...),
@@ -30,25 +42,33 @@ async def create_dumping_report(
     description: Optional[str] = Form(None),
     waste_type: str = Form(...),
     severity: str = Form(...),
+    latitude: Optional[float] = Form(None),
+    longitude: Optional[float] = Form(None),
     db: AsyncSession = Depends(get_db),
     current_user: UserOut = Depends(get_current_user)
 ):
     try:
         # Save the uploaded file
-        filename, image_url = save_uploaded_file(image)
+        _, image_url = await save_image_blob(image)
+        # Committed together with the report by create_report
+        enqueue(db, IMAGE_VARIANTS_JOB, {"image_url": image_url})
         
         # Create report data
         report_data = ReportCreate(
             location=location,
             description=description,
             waste_type=waste_type,
-            severity=severity
+            severity=severity,
+            latitude=latitude,
+            longitude=longitude
         )
         
         # Create report in database
         db_report = await create_report(db, report_data, current_user.id, image_url)
         return db_report
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating report: {str(e)}")
         raise HTTPException(
@@ -56,14 +76,121 @@ async def create_dumping_report(
             detail=str(e)
         )
 
+# Resumable uploads for flaky connections: create a session, PATCH chunks
+# at the current offset (HEAD tells where to resume), then complete it
+# into a report.
+
+async def get_upload_session_or_404(upload_id: str, current_user: UserOut) -> dict:
+    session = await upload_sessions.get(upload_id, current_user.id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return session
+
+def upload_offset_headers(session: dict) -> dict:
+    return {
+        UPLOAD_OFFSET_HEADER: str(session["offset"]),
+        UPLOAD_LENGTH_HEADER: str(session["size"]),
+        "Cache-Control": "no-store",
+    }
+
+@router.post("/uploads", response_model=UploadSessionOut, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    response: Response,
+    current_user: UserOut = Depends(get_current_user)
+):
+    if upload.content_type not in IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type. Allowed types: {', '.join(IMAGE_EXTENSIONS)}"
+        )
+    if upload.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Max size: {MAX_FILE_SIZE//(1024*1024)}MB"
+        )
+    session = await upload_sessions.create(current_user.id, upload.size, upload.content_type)
+    response.headers["Location"] = f"{router.prefix}/uploads/{session['id']}"
+    return UploadSessionOut(upload_id=session["id"], size=session["size"], offset=session["offset"])
+
+@router.head("/uploads/{upload_id}")
+async def get_upload_offset(
+    upload_id: str,
+    current_user: UserOut = Depends(get_current_user)
+):
+    session = await get_upload_session_or_404(upload_id, current_user)
+    return Response(status_code=status.HTTP_200_OK, headers=upload_offset_headers(session))
+
+@router.patch("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias=UPLOAD_OFFSET_HEADER, ge=0),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """Append the raw request body at ``Upload-Offset``; chunks are bounded by the request body limit"""
+    if request.headers.get("content-type") != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Chunks must be sent as {CHUNK_CONTENT_TYPE}"
+        )
+    session = await get_upload_session_or_404(upload_id, current_user)
+    session["offset"] = await upload_sessions.append(session, upload_offset, request.stream())
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=upload_offset_headers(session))
+
+@router.post("/uploads/{upload_id}/complete", response_model=ReportOut, status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    upload_id: str,
+    report_data: ReportCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserOut = Depends(get_current_user)
+):
+    # Looked up before locking, so ids that do not exist never get a lock
+    await get_upload_session_or_404(upload_id, current_user)
+    # Held throughout so a concurrent completion waits, then finds the session gone
+    async with upload_sessions.lock(upload_id):
+        session = await upload_sessions.get(upload_id, current_user.id)
+        if session is None:
+            upload_sessions.drop_lock(upload_id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found"
+            )
+        if session["offset"] != session["size"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: {session['offset']} of {session['size']} bytes received",
+                headers=upload_offset_headers(session)
+            )
+        try:
+            # The session file is copied, not moved, so a failed insert can be retried
+            _, image_url = await save_file_as_blob(upload_sessions.data_path(upload_id), session["content_type"])
+            enqueue(db, IMAGE_VARIANTS_JOB, {"image_url": image_url})
+            db_report = await create_report(db, report_data, current_user.id, image_url)
+            await upload_sessions.delete(upload_id)
+            return db_report
+        except Exception as e:
+            logger.error(f"Error completing upload {upload_id}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error creating report from upload"
+            )
+
 @router.get("/dumping/mine", response_model=ReportList)
 async def get_my_reports(
     status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: UserOut = Depends(get_current_user)
 ):
-    reports = await get_user_reports(db, current_user.id, status)
-    return {"reports": reports, "count": len(reports)}
+    reports = await get_user_reports(db, current_user.id, status, limit=limit, cursor=cursor)
+    count = await count_user_reports(db, current_user.id, status)
+    next_cursor = encode_cursor(reports[-1].created_at, reports[-1].id) if len(reports) == limit else None
+    return report_list_serializer.response({"reports": reports, "count": count, "next_cursor": next_cursor})
 
 @router.get("/dumping/{report_id}", response_model=ReportOut)
 async def get_report(
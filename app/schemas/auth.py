@@ -52,6 +52,8 @@ class CollectorProfileCreate(BaseModel):
     quantity_accepted: List[QuantityEnum] = Field(..., min_items=1)
     whatsapp_number: Optional[str] = Field(None, min_length=10, max_length=15)
     status: CollectorStatusEnum = Field(default=CollectorStatusEnum.OFFLINE)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
     @validator('price_max')
     def price_max_greater_than_min(cls, v, values, **kwargs):
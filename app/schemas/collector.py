@@ -160,6 +160,9 @@ class SimpleCollectorResponse(BaseModel):
     quantity_accepted: List[str] = []
     whatsapp_number: Optional[str] = None
     average_rating: float = 0.0
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    status: Optional[CollectorStatusEnum] = None
     
     @field_validator('working_days', mode='before')
     @classmethod
@@ -206,6 +209,22 @@ class SimpleCollectorResponse(BaseModel):
                 return [q.strip() for q in v.split(',') if q.strip()]
         return []
 
+class NearbyCollectorResponse(SimpleCollectorResponse):
+    """Collector returned by the nearby search, with its distance from the query point"""
+    distance_km: float
+
+class CollectorMatch(SimpleCollectorResponse):
+    """Collector able to take a listing; rank 1 is the best match"""
+    status: CollectorStatusEnum
+    rank: int
+
+class CollectorHeartbeat(BaseModel):
+    status: CollectorStatusEnum = CollectorStatusEnum.AVAILABLE
+
+class CollectorHeartbeatResponse(BaseModel):
+    status: CollectorStatusEnum
+    expires_in_seconds: float
+
 class CollectorSearchParams(BaseModel):
     name: Optional[str] = None
     location: Optional[str] = None
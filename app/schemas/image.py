@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel, computed_field
+from app.core.images import image_variant_url
+
+class ImageVariantsMixin(BaseModel):
+    """Adds resized-variant URLs derived from ``image_url``"""
+
+    image_url: str
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return image_variant_url(self.image_url, "thumb")
+
+    @computed_field
+    @property
+    def medium_url(self) -> Optional[str]:
+        return image_variant_url(self.image_url, "medium")
@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Optional
 from pydantic import BaseModel, Field, ConfigDict
 from app.models.marketplace import ListingStatusEnum
+from app.schemas.image import ImageVariantsMixin
 from app.models.collector import WasteTypeEnum, QuantityEnum
 
 class ListingBase(BaseModel):
@@ -12,6 +13,8 @@ class ListingBase(BaseModel):
     price: float = Field(..., gt=0)
     quantity: QuantityEnum
     location: str = Field(..., min_length=2, max_length=100)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class ListingCreate(ListingBase):
     image_url: str = Field(..., min_length=1)
@@ -22,7 +25,7 @@ class ListingUpdate(BaseModel):
     price: Optional[float] = Field(None, gt=0)
     status: Optional[ListingStatusEnum] = None
 
-class ListingResponse(ListingBase):
+class ListingResponse(ListingBase, ImageVariantsMixin):
     model_config = ConfigDict(from_attributes=True)
     
     id: int
@@ -45,8 +48,10 @@ class ListingSearchParams(BaseModel):
     status: Optional[ListingStatusEnum] = None
     limit: int = Field(default=10, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # keyset cursor; takes precedence over offset
+    fuzzy: bool = False  # typo-tolerant location match ranked by similarity
 
-class ListingSummary(BaseModel):
+class ListingSummary(ImageVariantsMixin):
     model_config = ConfigDict(from_attributes=True)
     
     id: int
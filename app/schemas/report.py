@@ -2,6 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 from pydantic import BaseModel, Field
+from app.schemas.image import ImageVariantsMixin
 
 class WasteTypeEnum(str, Enum):
     PLASTIC = "PLASTIC"
@@ -24,11 +25,13 @@ class ReportBase(BaseModel):
     description: Optional[str] = Field(None, max_length=1000)
     waste_type: WasteTypeEnum
     severity: SeverityLevelEnum
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class ReportCreate(ReportBase):
     pass
 
-class ReportOut(ReportBase):
+class ReportOut(ReportBase, ImageVariantsMixin):
     id: int
     user_id: int
     image_url: str
@@ -40,7 +43,17 @@ class ReportOut(ReportBase):
 
 class ReportList(BaseModel):
     reports: list[ReportOut]
-    count: int
+    count: int  # total matching reports, not just this page
+    next_cursor: Optional[str] = None
 
 class ReportStatusUpdate(BaseModel):
-    status: ReportStatusEnum
\ No newline at end of file
+    status: ReportStatusEnum
+
+class UploadSessionCreate(BaseModel):
+    size: int = Field(..., gt=0, description="Total size of the image in bytes")
+    content_type: str
+
+class UploadSessionOut(BaseModel):
+    upload_id: str
+    size: int
+    offset: int
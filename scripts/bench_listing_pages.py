@@ -0,0 +1,154 @@
+"""Benchmark: latency and memory per page of GET /marketplace/listings/.
+
+Compares what the endpoint used to do for each page (load Listing ORM
+objects with selectinload of resident and collector, build each
+ListingSummary by hand, then let FastAPI validate and render the list)
+with get_listing_summaries, a column projection joined to the resident's
+name and encoded with ListSerializer. Pages are walked with the keyset
+cursor, each in its own session, like separate requests. Latency and
+allocation (tracemalloc peak) are measured in separate passes, so tracing
+does not inflate the timings.
+
+Runs against the database in DATABASE_URL (migrated to head), seeds
+``--rows`` listings and deletes them when done:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_listing_pages.py [--rows 20000] [--page-size 100] [--pages 50]
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import delete, insert, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.pagination import encode_cursor
+from app.core.serialization import ListSerializer
+from app.crud.marketplace import get_listing_summaries, get_listings
+from app.models.marketplace import Listing, ListingStatusEnum
+from app.models.user import RoleEnum, User
+from app.schemas.marketplace import ListingSearchParams, ListingSummary
+
+SEED = text("""
+    INSERT INTO marketplace_listings
+        (resident_id, title, description, waste_type, price, quantity, location, image_url, status, created_at, updated_at)
+    SELECT
+        :resident_id,
+        :title,
+        'Sorted and bagged, pickup any weekday morning. ' || repeat('Details. ', 20),
+        (ARRAY['PLASTIC', 'ORGANIC', 'ELECTRONIC', 'HAZARDOUS', 'GENERAL'])[1 + i % 5]::wastetypeenum,
+        50 + i % 950,
+        (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + i % 3]::quantityenum,
+        'Nairobi, plot ' || i,
+        '/uploads/blobs/ab/cd/' || md5(i::text) || '.jpg',
+        'AVAILABLE'::listingstatusenum,
+        now() - i * interval '1 second',
+        now()
+    FROM generate_series(1, :rows) AS i
+""")
+
+response_field = create_response_field(name="Response_get_all_listings", type_=List[ListingSummary])
+
+async def orm_page(params: ListingSearchParams):
+    """What GET /marketplace/listings/ did before get_listing_summaries"""
+    async with AsyncSessionLocal() as db:
+        listings = await get_listings(db, params)
+        summaries = [
+            ListingSummary(
+                **listing.__dict__,
+                resident_name=listing.resident.full_name
+            ) for listing in listings
+        ]
+    content = await serialize_response(field=response_field, response_content=summaries)
+    return listings, JSONResponse(content).body
+
+listing_summary_serializer = ListSerializer(ListingSummary)
+
+async def projection_page(params: ListingSearchParams):
+    async with AsyncSessionLocal() as db:
+        listings = await get_listing_summaries(db, params)
+    return listings, listing_summary_serializer.response(listings).body
+
+async def walk(render, page_size: int, pages: int, trace: bool) -> List[float]:
+    """Per-page seconds, or per-page tracemalloc peak bytes if ``trace``"""
+    samples = []
+    cursor: Optional[str] = None
+    for _ in range(pages):
+        params = ListingSearchParams(limit=page_size, cursor=cursor, status=ListingStatusEnum.AVAILABLE)
+        gc.collect()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        listings, _ = await render(params)
+        elapsed = time.perf_counter() - start
+        if trace:
+            samples.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        else:
+            samples.append(elapsed)
+        if len(listings) < page_size:
+            break
+        cursor = encode_cursor(listings[-1].created_at, listings[-1].id)
+    return samples
+
+async def measure(name: str, render, page_size: int, pages: int) -> float:
+    await walk(render, page_size, 2, trace=False)  # warm up
+    timings = await walk(render, page_size, pages, trace=False)
+    peaks = await walk(render, page_size, pages, trace=True)
+    median = statistics.median(timings) * 1000
+    print(
+        f"{name:<12} median {median:8.2f} ms   min {min(timings) * 1000:8.2f} ms   "
+        f"peak alloc {statistics.median(peaks) / 1024:8.0f} KiB/page   {len(timings)} pages"
+    )
+    return median
+
+async def seed(rows: int, title: str) -> None:
+    async with AsyncSessionLocal() as db:
+        resident_id = (await db.execute(
+            insert(User).values(
+                full_name="Bench resident", email=f"{title}@example.com", password_hash="!",
+                role=RoleEnum.RESIDENT, is_active=True
+            ).returning(User.id)
+        )).scalar_one()
+        await db.execute(SEED, {"resident_id": resident_id, "title": title, "rows": rows})
+        await db.commit()
+        await db.execute(text("ANALYZE marketplace_listings"))
+        await db.commit()
+
+async def cleanup(title: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Listing).where(Listing.title == title))
+        await db.execute(delete(User).where(User.email == f"{title}@example.com"))
+        await db.commit()
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    title = f"bench-pages-{uuid.uuid4().hex[:8]}"
+    try:
+        await seed(args.rows, title)
+        print(f"{args.rows} listings, {args.page_size} per page, up to {args.pages} pages")
+        before = await measure("ORM", orm_page, args.page_size, args.pages)
+        after = await measure("projection", projection_page, args.page_size, args.pages)
+        print(f"speedup x{before / after:.1f}")
+    finally:
+        await cleanup(title)
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
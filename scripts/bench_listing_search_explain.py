@@ -0,0 +1,150 @@
+"""Benchmark: query plans for listing location search at 1M rows.
+
+Seeds ``--rows`` listings with generate_series, ANALYZEs the table, then
+runs EXPLAIN (ANALYZE, BUFFERS) on the queries GET /marketplace/listings
+builds for a substring (ILIKE) and a fuzzy (word_similarity) location
+search. Each query is run once as planned and once with bitmap scans
+disabled, which leaves Postgres the plans it had before the trigram
+index. A common term may still be cheapest by walking created_at and
+stopping at the limit; rare terms and fuzzy search show the difference.
+
+Runs against the database in DATABASE_URL (migrated to head) and deletes
+the rows it seeded unless ``--keep`` is given:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_listing_search_explain.py [--rows 1000000] [--verbose]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import delete, insert, select, text
+
+from app.core.database import AsyncSessionLocal, engine
+from app.crud.marketplace import LISTING_SUMMARY_COLUMNS, _apply_search_params
+from app.models.marketplace import Listing
+from app.models.user import RoleEnum, User
+from app.schemas.marketplace import ListingSearchParams
+
+AREAS = [
+    "Westlands", "Kilimani", "Lavington", "Karen", "Kileleshwa", "Parklands", "Eastleigh", "South B",
+    "South C", "Embakasi", "Kasarani", "Roysambu", "Ruaka", "Langata", "Donholm", "Buruburu",
+]
+
+SEED = text("""
+    INSERT INTO marketplace_listings
+        (resident_id, title, waste_type, price, quantity, location, image_url, status, created_at, updated_at)
+    SELECT
+        :resident_id,
+        :title,
+        (ARRAY['PLASTIC', 'ORGANIC', 'ELECTRONIC', 'HAZARDOUS', 'GENERAL'])[1 + i % 5]::wastetypeenum,
+        50 + i % 950,
+        (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + i % 3]::quantityenum,
+        (CAST(:areas AS text[]))[1 + (i * 7) % :area_count] || ', Nairobi, plot ' || (i % 9973),
+        '/uploads/bench.jpg',
+        (ARRAY['AVAILABLE', 'AVAILABLE', 'RESERVED', 'SOLD'])[1 + i % 4]::listingstatusenum,
+        now() - i * interval '1 second',
+        now()
+    FROM generate_series(1, :rows) AS i
+""")
+
+SEARCHES = {
+    "substring": ListingSearchParams(location="kilimani", limit=20),
+    "substring, rare": ListingSearchParams(location="plot 4242", limit=20),
+    "fuzzy": ListingSearchParams(location="kilimanj", fuzzy=True, limit=20),
+}
+
+def listing_search_sql(search_params: ListingSearchParams) -> str:
+    """SQL of the listing summaries query, as get_listing_summaries builds it"""
+    query = (
+        select(*LISTING_SUMMARY_COLUMNS, User.full_name.label("resident_name"))
+        .join(User, User.id == Listing.resident_id)
+    )
+    query = _apply_search_params(query, search_params, include_sold=False)
+    # The driver's own dialect, so '%' is not escaped for a pyformat driver
+    return str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+async def explain(sql: str, use_index: bool) -> dict:
+    async with AsyncSessionLocal() as db:
+        if not use_index:
+            # GIN indexes are only reachable through bitmap scans
+            await db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        # Sent as is: the literal-bound SQL must not be parsed for :params
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+        plan = result.scalar_one()
+        await db.rollback()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+def scan_nodes(node: dict) -> list:
+    """Scans in a plan, e.g. 'Bitmap Index Scan using ix_marketplace_listings_location_trgm'"""
+    nodes = []
+    if "Index Name" in node:
+        nodes.append(f"{node['Node Type']} using {node['Index Name']}")
+    elif "Relation Name" in node:
+        nodes.append(f"{node['Node Type']} on {node['Relation Name']}")
+    for child in node.get("Plans", []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+async def seed(rows: int, title: str) -> int:
+    async with AsyncSessionLocal() as db:
+        resident_id = (await db.execute(
+            insert(User).values(
+                full_name="Bench resident", email=f"{title}@example.com", password_hash="!",
+                role=RoleEnum.RESIDENT, is_active=True
+            ).returning(User.id)
+        )).scalar_one()
+        await db.execute(SEED, {
+            "resident_id": resident_id, "title": title, "areas": AREAS, "area_count": len(AREAS), "rows": rows
+        })
+        await db.commit()
+        await db.execute(text("ANALYZE marketplace_listings"))
+        await db.commit()
+    return resident_id
+
+async def cleanup(title: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Listing).where(Listing.title == title))
+        await db.execute(delete(User).where(User.email == f"{title}@example.com"))
+        await db.commit()
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    parser.add_argument("--verbose", action="store_true", help="print the full plans")
+    args = parser.parse_args()
+
+    title = f"bench-search-{uuid.uuid4().hex[:8]}"
+    try:
+        start = time.perf_counter()
+        await seed(args.rows, title)
+        print(f"seeded {args.rows} listings in {time.perf_counter() - start:.1f} s")
+        for name, search_params in SEARCHES.items():
+            sql = listing_search_sql(search_params)
+            timings = {}
+            for use_index in (False, True):
+                plan = await explain(sql, use_index)
+                label = "trigram index" if use_index else "no index"
+                timings[use_index] = plan["Execution Time"]
+                print(
+                    f"{name:<16} {label:<14} {plan['Execution Time']:10.2f} ms   "
+                    f"shared hit+read {plan['Plan'].get('Shared Hit Blocks', 0) + plan['Plan'].get('Shared Read Blocks', 0):8d}   "
+                    f"{', '.join(scan_nodes(plan['Plan']))}"
+                )
+                if args.verbose:
+                    print(json.dumps(plan["Plan"], indent=2))
+            print(f"{name:<16} speedup x{timings[False] / timings[True]:.1f}")
+    finally:
+        if not args.keep:
+            await cleanup(title)
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
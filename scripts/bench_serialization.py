@@ -0,0 +1,114 @@
+"""Microbenchmark: serializing a page of collectors for GET /collectors/.
+
+Compares the per-item loop the endpoint used to run (build each
+SimpleCollectorResponse by hand, then let FastAPI validate the list
+against response_model and render it with JSONResponse) with
+ListSerializer, which validates once and encodes with pydantic-core.
+
+Rows are transient CollectorProfile instances, so no database is needed:
+
+    python scripts/bench_serialization.py [--rows 1000] [--repeat 50]
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import ListSerializer
+from app.models.user import User  # noqa: F401  (resolves CollectorProfile.user)
+from app.models.collector import CollectorProfile, CollectorStatusEnum, QuantityEnum, WasteTypeEnum
+from app.schemas.collector import SimpleCollectorResponse
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+def make_rows(count: int) -> List[CollectorProfile]:
+    waste_types = list(WasteTypeEnum)
+    return [
+        CollectorProfile(
+            id=i,
+            user_id=i,
+            location=f"Nairobi, area {i % 97}",
+            price_min=100 + i % 50,
+            price_max=500 + i % 200,
+            working_days=DAYS[:1 + i % len(DAYS)],
+            waste_types=[waste_types[i % len(waste_types)].value, WasteTypeEnum.GENERAL.value],
+            quantity_accepted=[QuantityEnum.SMALL.value, QuantityEnum.MEDIUM.value],
+            whatsapp_number=f"+2547{i:08d}",
+            average_rating=(i % 50) / 10,
+            status=CollectorStatusEnum.AVAILABLE,
+            latitude=-1.28 + i * 1e-4,
+            longitude=36.82 + i * 1e-4,
+        )
+        for i in range(count)
+    ]
+
+response_field = create_response_field(name="Response_get_all_collectors", type_=List[SimpleCollectorResponse])
+
+async def per_item_loop(rows) -> bytes:
+    """What GET /collectors/ did before ListSerializer"""
+    collector_responses = []
+    for collector in rows:
+        collector_responses.append(SimpleCollectorResponse(
+            id=collector.id,
+            user_id=collector.user_id,
+            location=collector.location,
+            price_min=collector.price_min,
+            price_max=collector.price_max,
+            working_days=collector.working_days,
+            waste_types=collector.waste_types,
+            quantity_accepted=getattr(collector, 'quantity_accepted', []),
+            whatsapp_number=getattr(collector, 'whatsapp_number', None),
+            average_rating=getattr(collector, 'average_rating', 0.0)
+        ))
+    content = await serialize_response(field=response_field, response_content=collector_responses)
+    return JSONResponse(content).body
+
+list_serializer = ListSerializer(SimpleCollectorResponse, skip_invalid=True)
+
+async def list_serializer_path(rows) -> bytes:
+    return list_serializer.response(rows).body
+
+async def measure(name: str, render, rows, repeat: int) -> float:
+    await render(rows)  # warm up
+    timings = []
+    for _ in range(repeat):
+        # Like timeit: collect up front so GC pauses do not land in one side's timings
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            body = await render(rows)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    median = statistics.median(timings) * 1000
+    print(
+        f"{name:<16} median {median:8.2f} ms   min {min(timings) * 1000:8.2f} ms   "
+        f"{len(rows) / (median / 1000):10.0f} rows/s   {len(body)} bytes"
+    )
+    return median
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} collectors, {args.repeat} runs each")
+    before = await measure("per-item loop", per_item_loop, rows, args.repeat)
+    after = await measure("ListSerializer", list_serializer_path, rows, args.repeat)
+    print(f"speedup x{before / after:.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
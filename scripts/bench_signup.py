@@ -0,0 +1,130 @@
+"""Benchmark: database work of POST /auth/register/collector.
+
+Compares the sequence the endpoint used to run (ilike pre-check, INSERT
+user, commit, refresh, INSERT profile, commit, refresh, reload with
+selectinload) with create_collector_with_profile, one INSERT ... RETURNING
+statement and one commit. Password hashing is the same on both sides and
+is left out; a fixed hash is stored.
+
+Runs against the database in DATABASE_URL (migrated to head), with
+``--concurrency`` signups in flight at a time, and deletes the users it
+created when done:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/bench_signup.py [--signups 500] [--concurrency 1]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal, engine
+from app.crud.user import create_collector_with_profile
+from app.models.collector import CollectorProfile
+from app.models.user import RoleEnum, User
+from app.schemas.auth import CollectorProfileCreate
+from app.schemas.user import UserWithProfile
+
+# Any valid bcrypt hash; nothing logs in with these users
+PASSWORD_HASH = "$2b$12$KIXQJx4Jv6ZV2j4yVq0Z1eJ0x5p7m0jVYk7E2m4L9yQ3p8C4Q1n2a"
+
+PROFILE = CollectorProfileCreate(
+    location="Nairobi, Westlands",
+    price_min=100,
+    price_max=500,
+    working_days=["Monday", "Wednesday", "Friday"],
+    waste_types=["PLASTIC", "GENERAL"],
+    quantity_accepted=["SMALL", "MEDIUM"],
+    whatsapp_number="+254700000000",
+    latitude=-1.2676,
+    longitude=36.8108,
+)
+
+def user_data(email: str) -> dict:
+    return {"full_name": "Bench collector", "email": email, "role": RoleEnum.COLLECTOR, "password_hash": PASSWORD_HASH}
+
+async def separate_statements(email: str) -> None:
+    """What the endpoint did before create_collector_with_profile"""
+    async with AsyncSessionLocal() as db:
+        existing = (await db.execute(select(User).where(User.email.ilike(email)))).scalar_one_or_none()
+        assert existing is None
+        new_user = User(**user_data(email))
+        db.add(new_user)
+        await db.commit()
+        await db.refresh(new_user)
+        db_profile = CollectorProfile(
+            user_id=new_user.id,
+            location=PROFILE.location,
+            price_min=PROFILE.price_min,
+            price_max=PROFILE.price_max,
+            working_days=PROFILE.working_days,
+            waste_types=PROFILE.waste_types,
+            quantity_accepted=PROFILE.quantity_accepted,
+            whatsapp_number=PROFILE.whatsapp_number
+        )
+        db.add(db_profile)
+        await db.commit()
+        await db.refresh(db_profile)
+        stmt = select(User).options(selectinload(User.collector_profile)).where(User.id == new_user.id)
+        UserWithProfile.model_validate((await db.execute(stmt)).scalar_one())
+
+async def single_statement(email: str) -> None:
+    async with AsyncSessionLocal() as db:
+        row = await create_collector_with_profile(db, user_data(email), PROFILE)
+        assert row is not None
+
+async def measure(name: str, signup, run_id: str, signups: int, concurrency: int) -> float:
+    slots = asyncio.Semaphore(concurrency)
+    timings: List[float] = []
+
+    async def one(i: int) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await signup(f"bench-{run_id}-{name.split()[0]}-{i}@example.com")
+            timings.append(time.perf_counter() - start)
+
+    await signup(f"bench-{run_id}-{name.split()[0]}-warmup@example.com")
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(signups)))
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    median = statistics.median(timings) * 1000
+    print(
+        f"{name:<22} median {median:8.2f} ms   p99 {timings[int(len(timings) * 0.99)] * 1000:8.2f} ms   "
+        f"{signups / elapsed:8.0f} signups/s"
+    )
+    return median
+
+async def cleanup(run_id: str) -> None:
+    async with AsyncSessionLocal() as db:
+        users = select(User.id).where(User.email.like(f"bench-{run_id}-%"))
+        await db.execute(delete(CollectorProfile).where(CollectorProfile.user_id.in_(users)))
+        await db.execute(delete(User).where(User.email.like(f"bench-{run_id}-%")))
+        await db.commit()
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signups", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    print(f"{args.signups} signups each, {args.concurrency} at a time")
+    try:
+        before = await measure("separate statements", separate_statements, run_id, args.signups, args.concurrency)
+        after = await measure("single statement", single_statement, run_id, args.signups, args.concurrency)
+    finally:
+        await cleanup(run_id)
+        await engine.dispose()
+    print(f"speedup x{before / after:.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""Benchmark: requests per second for /uploads, cold and hot.
+
+Cold is a client without a copy: a full 200 with the file body. Hot is a
+client revalidating the copy it has: If-None-Match with the ETag from the
+cold response, answered with a bodiless 304. (With the immutable
+Cache-Control that UploadStaticFiles sends for blobs, a browser makes no
+request at all for hot blobs; 304s are what proxies and clients that
+ignore immutable still pay.) A single-range 206 is measured as well.
+
+Both the plain StaticFiles mount the app used before and UploadStaticFiles
+are called as ASGI apps in process, without an HTTP client or server, so
+the numbers are the server-side cost per request. Files are written under
+a temporary directory that is removed afterwards:
+
+    python scripts/bench_static.py [--size-kb 200] [--requests 2000]
+"""
+import argparse
+import asyncio
+import gc
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.core.file_handling import blob_path
+from app.core.static import UploadStaticFiles
+
+async def request(app, path: str, headers: dict):
+    """Run one GET through ``app``; returns (status, response headers, body bytes)"""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+    }
+    response = {"body": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {name.decode(): value.decode() for name, value in message["headers"]}
+        else:
+            response["body"] += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+async def measure(name: str, app, path: str, headers: dict, expected_status: int, requests: int) -> float:
+    status, _, body = await request(app, path, headers)  # warm up
+    assert status == expected_status, f"{name}: got {status}, expected {expected_status}"
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await request(app, path, headers)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    rate = requests / elapsed
+    print(f"{name:<32} {rate:10.0f} req/s   {elapsed / requests * 1e6:8.1f} us/req   {body:8d} body bytes")
+    return rate
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-static-")
+    try:
+        content = os.urandom(args.size_kb * 1024)
+        relative = f"blobs/{blob_path(hashlib.sha256(content).hexdigest(), 'jpg')}"
+        Path(workdir, relative).parent.mkdir(parents=True)
+        Path(workdir, relative).write_bytes(content)
+        app = Starlette(routes=[
+            Mount("/before", StaticFiles(directory=workdir)),
+            Mount("/uploads", UploadStaticFiles(directory=workdir)),
+        ])
+
+        print(f"{args.size_kb} KB blob, {args.requests} sequential requests each")
+        for mount in ("before", "uploads"):
+            path = f"/{mount}/{relative}"
+            _, headers, _ = await request(app, path, {})
+            label = "StaticFiles" if mount == "before" else "UploadStaticFiles"
+            cold = await measure(f"{label} cold (200)", app, path, {}, 200, args.requests)
+            hot = await measure(
+                f"{label} hot (304)", app, path, {"if-none-match": headers["etag"]}, 304, args.requests
+            )
+            if mount == "uploads":
+                await measure(f"{label} range (206)", app, path, {"range": "bytes=0-65535"}, 206, args.requests)
+            print(f"{label} hot/cold x{hot / cold:.1f}   cache-control: {headers.get('cache-control', '-')}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""Benchmark: 50 concurrent image uploads.
+
+Compares the old save_uploaded_file (read the whole upload into memory
+and write it with blocking calls on the event loop) with save_image_blob,
+which streams 64KB chunks through the threadpool into the blob store.
+Uploads are UploadFile objects over spooled temporary files, as the
+multipart parser hands them to the endpoint, so no server or database is
+needed. Reports wall time, the longest event loop stall seen by a 10ms
+ticker (what every other request on the worker waits for), and the
+tracemalloc peak, measured in a separate pass.
+
+Files are written under a temporary directory that is removed afterwards:
+
+    python scripts/bench_uploads.py [--uploads 50] [--size-mb 4] [--repeat 5]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.core.file_handling import IMAGE_EXTENSIONS, save_image_blob, validate_image_type
+
+def make_upload(payload: bytes) -> UploadFile:
+    # Starlette's multipart parser spools to disk past 1MB
+    spooled = SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(spooled, size=len(payload), filename="photo.jpg", headers=Headers({"content-type": "image/jpeg"}))
+
+async def whole_file(file: UploadFile) -> None:
+    """What the upload endpoints did before stream_upload_to_disk"""
+    Path("uploads").mkdir(parents=True, exist_ok=True)
+    validate_image_type(file)
+    filename = f"{uuid.uuid4()}.{IMAGE_EXTENSIONS[file.content_type]}"
+    with open(os.path.join("uploads", filename), "wb") as buffer:
+        buffer.write(file.file.read())
+
+async def streamed(file: UploadFile) -> None:
+    await save_image_blob(file)
+
+async def ticker(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Longest delay past ``interval`` between wake-ups, i.e. the worst loop stall"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+async def run_once(save, payloads, trace: bool):
+    uploads = [make_upload(payload) for payload in payloads]
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    stop = asyncio.Event()
+    stall = asyncio.create_task(ticker(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(save(upload) for upload in uploads))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_stall = await stall
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    for upload in uploads:
+        await upload.close()
+    return elapsed, worst_stall, peak
+
+async def measure(name: str, save, payloads, repeat: int) -> float:
+    await run_once(save, payloads[:2], trace=False)  # warm up
+    runs = [await run_once(save, payloads, trace=False) for _ in range(repeat)]
+    _, _, peak = await run_once(save, payloads, trace=True)
+    median = statistics.median(elapsed for elapsed, _, _ in runs) * 1000
+    mb = sum(len(payload) for payload in payloads) / (1024 * 1024)
+    print(
+        f"{name:<12} median {median:8.1f} ms   {mb / (median / 1000):7.0f} MB/s   "
+        f"worst loop stall {max(stall for _, stall, _ in runs) * 1000:7.1f} ms   "
+        f"peak alloc {peak / (1024 * 1024):7.1f} MB"
+    )
+    return median
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Distinct content, so the blob store cannot deduplicate the uploads away
+    payloads = [os.urandom(int(args.size_mb * 1024 * 1024)) for _ in range(args.uploads)]
+    workdir = tempfile.mkdtemp(prefix="bench-uploads-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        print(f"{args.uploads} concurrent uploads of {args.size_mb} MB, {args.repeat} runs each")
+        before = await measure("whole file", whole_file, payloads, args.repeat)
+        after = await measure("streamed", streamed, payloads, args.repeat)
+        print(f"wall time x{before / after:.2f}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""Stress test: many collectors reserving the same listing at once.
+
+Each round inserts a fresh AVAILABLE listing, then has ``--clients``
+collectors call update_listing_status(..., RESERVED) on it concurrently,
+each in its own session. The conditional UPDATE must let exactly one of
+them win; every other attempt must raise ListingStatusConflict, and the
+stored row must name the winner. Reports attempts per second and
+per-attempt latency.
+
+Runs against the database in DATABASE_URL (migrated to head) and deletes
+the users and listings it created when done. Raise DB_POOL_SIZE /
+DB_MAX_OVERFLOW to have more attempts in flight at once:
+
+    DATABASE_URL=postgresql+asyncpg://... python scripts/stress_listing_reserve.py [--clients 100] [--rounds 20]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import delete, insert, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.crud.marketplace import ListingStatusConflict, update_listing_status
+from app.models.marketplace import Listing, ListingStatusEnum
+from app.models.user import RoleEnum, User
+
+async def create_users(run_id: str, clients: int) -> Tuple[int, List[int]]:
+    """A resident and ``clients`` collectors; returns (resident_id, collector_ids)"""
+    rows = [
+        {"full_name": f"Stress resident {run_id}", "email": f"stress-{run_id}-resident@example.com", "role": RoleEnum.RESIDENT}
+    ] + [
+        {"full_name": f"Stress collector {i}", "email": f"stress-{run_id}-collector-{i}@example.com", "role": RoleEnum.COLLECTOR}
+        for i in range(clients)
+    ]
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            insert(User).values([{**row, "password_hash": "!", "is_active": True} for row in rows]).returning(User.id, User.role)
+        )
+        users = result.all()
+        await db.commit()
+    resident_id = next(user_id for user_id, role in users if role == RoleEnum.RESIDENT)
+    return resident_id, [user_id for user_id, role in users if role == RoleEnum.COLLECTOR]
+
+async def create_listing(resident_id: int, run_id: str) -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            insert(Listing).values(
+                resident_id=resident_id,
+                title=f"Stress listing {run_id}",
+                waste_type="PLASTIC",
+                price=100.0,
+                quantity="SMALL",
+                location="Nairobi",
+                image_url="/uploads/stress.jpg",
+                status=ListingStatusEnum.AVAILABLE,
+            ).returning(Listing.id)
+        )
+        listing_id = result.scalar_one()
+        await db.commit()
+    return listing_id
+
+async def attempt(listing_id: int, collector_id: int, start: asyncio.Event) -> Tuple[Optional[int], float]:
+    """Reserve the listing for ``collector_id``; returns (winner id or None, seconds taken)"""
+    await start.wait()
+    began = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        try:
+            row = await update_listing_status(db, listing_id, ListingStatusEnum.RESERVED, collector_id)
+        except ListingStatusConflict:
+            return None, time.perf_counter() - began
+    assert row is not None, f"listing {listing_id} vanished"
+    return collector_id, time.perf_counter() - began
+
+async def run_round(resident_id: int, collector_ids: List[int], run_id: str) -> Tuple[float, List[float]]:
+    listing_id = await create_listing(resident_id, run_id)
+    start = asyncio.Event()
+    tasks = [asyncio.create_task(attempt(listing_id, collector_id, start)) for collector_id in collector_ids]
+    await asyncio.sleep(0)  # let every task reach start.wait()
+    began = time.perf_counter()
+    start.set()
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - began
+
+    winners = [winner for winner, _ in results if winner is not None]
+    assert len(winners) == 1, f"listing {listing_id}: {len(winners)} winners, expected exactly one"
+    async with AsyncSessionLocal() as db:
+        status, stored_collector = (
+            await db.execute(select(Listing.status, Listing.collector_id).where(Listing.id == listing_id))
+        ).one()
+    assert status == ListingStatusEnum.RESERVED, f"listing {listing_id} is {status}"
+    assert stored_collector == winners[0], f"listing {listing_id} names {stored_collector}, winner was {winners[0]}"
+    return elapsed, [latency for _, latency in results]
+
+async def cleanup(run_id: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Listing).where(Listing.title == f"Stress listing {run_id}"))
+        await db.execute(delete(User).where(User.email.like(f"stress-{run_id}-%")))
+        await db.commit()
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    resident_id, collector_ids = await create_users(run_id, args.clients)
+    try:
+        elapsed = []
+        latencies = []
+        for _ in range(args.rounds):
+            round_seconds, round_latencies = await run_round(resident_id, collector_ids, run_id)
+            elapsed.append(round_seconds)
+            latencies.extend(round_latencies)
+    finally:
+        await cleanup(run_id)
+        await engine.dispose()
+
+    attempts = args.clients * args.rounds
+    latencies.sort()
+    print(f"{args.rounds} rounds x {args.clients} clients: exactly one winner every round")
+    print(
+        f"{attempts / sum(elapsed):10.0f} attempts/s   "
+        f"round median {statistics.median(elapsed) * 1000:8.2f} ms   "
+        f"latency p50 {latencies[len(latencies) // 2] * 1000:8.2f} ms   "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:8.2f} ms"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())